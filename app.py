@@ -2,50 +2,93 @@ import os
 import sys
 import subprocess
 import time
-import threading
 import argparse
 import webbrowser
-from dotenv import load_dotenv
 import socket
+import selectors
+import errno
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from database.setup_db import setup_database
-from utils.rasa_integration import RasaIntegration
+from utils.rasa_integration import RasaIntegration, RASA_COMMANDS, RASA_NAMES
+from utils.process_utils import wait_for_exit, stop_processes
+from utils.env import load_env
 
-def check_port_in_use(port):
-    """Check if a port is in use"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+# Load environment variables once at import
+load_env()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def check_ports_in_use(ports, timeout=0.2):
+    """
+    Check which of the given ports are in use
+    
+    All ports are probed at once with non-blocking connects so the checks
+    share a single wait instead of running one after another.
+    
+    Args:
+        ports (list): The ports to check
+        timeout (float): Seconds to wait for the connections to complete
+        
+    Returns:
+        dict: Maps each port to True if something is listening on it
+    """
+    results = {port: False for port in ports}
+    selector = selectors.DefaultSelector()
+    try:
+        for port in results:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setblocking(False)
+            error = s.connect_ex(('127.0.0.1', port))
+            if error == 0:
+                results[port] = True
+                s.close()
+            elif error in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                selector.register(s, selectors.EVENT_WRITE, port)
+            else:
+                s.close()
+        
+        # Collect connections as they complete until all are done or the timeout expires
+        deadline = time.monotonic() + timeout
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(timeout=remaining):
+                results[key.data] = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+    
+    return results
 
 def run_backend():
-    """Run the Flask backend server"""
+    """Start the Flask backend server and return its process"""
     try:
-        # Navigate to the backend directory and run Flask
+        # Run Flask from the backend directory with the current interpreter
         backend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
-        os.chdir(backend_path)
-        
-        # Use subprocess to run Flask
-        subprocess.run(["python", "app.py"])
+        return subprocess.Popen([sys.executable, "-u", "app.py"], cwd=backend_path)
     except Exception as e:
         print(f"Error starting backend server: {e}")
         print("Make sure you have installed all dependencies with 'pip install -r requirements.txt'")
+        return None
 
 def run_frontend():
-    """Run the Streamlit frontend"""
+    """Start the Streamlit frontend and return its process"""
     try:
-        # Navigate to the frontend directory and run Streamlit
+        # Run Streamlit from the frontend directory with the current interpreter
         frontend_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
-        os.chdir(frontend_path)
-        
-        # Use subprocess to run Streamlit
-        subprocess.run(["streamlit", "run", "app.py"])
+        return subprocess.Popen([sys.executable, "-m", "streamlit", "run", "app.py"], cwd=frontend_path)
     except Exception as e:
         print(f"Error starting frontend server: {e}")
         print("Make sure you have installed all dependencies with 'pip install -r requirements.txt'")
+        return None
 
 def run_rasa_bot():
-    """Run the Rasa chatbot"""
+    """Start the Rasa chatbot and return the Rasa and action server processes"""
     try:
         # Use the RasaIntegration class to start the Rasa servers
         rasa_integration = RasaIntegration()
@@ -57,38 +100,11 @@ def run_rasa_bot():
         print("- Rasa server: http://localhost:5005")
         print("- Action server: http://localhost:5055")
         
-        # Keep the processes alive
-        try:
-            while True:
-                time.sleep(1)
-                
-                # Check if processes are still running
-                if rasa_server_process.poll() is not None:
-                    print("Rasa server stopped unexpectedly. Restarting...")
-                    rasa_server_process = subprocess.Popen(
-                        ["rasa", "run", "--enable-api", "--cors", "*", "--port", "5005"],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                
-                if action_server_process.poll() is not None:
-                    print("Action server stopped unexpectedly. Restarting...")
-                    action_server_process = subprocess.Popen(
-                        ["rasa", "run", "actions", "--port", "5055"],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-        except KeyboardInterrupt:
-            # Terminate processes on interrupt
-            if rasa_server_process:
-                rasa_server_process.terminate()
-            if action_server_process:
-                action_server_process.terminate()
-            
-            print("Rasa servers stopped.")
+        return rasa_server_process, action_server_process
     except Exception as e:
         print(f"Error starting Rasa bot: {e}")
         print("Make sure Rasa is installed correctly with 'pip install -r requirements.txt'")
+        return None, None
 
 def check_postgresql_connection():
     """Check if PostgreSQL connection is working"""
@@ -96,7 +112,7 @@ def check_postgresql_connection():
         from sqlalchemy import create_engine
         
         # Get PostgreSQL connection string
-        db_url = os.getenv("DATABASE_URL")
+        db_url = DATABASE_URL
         if not db_url:
             print("Error: DATABASE_URL environment variable not set")
             return False
@@ -130,27 +146,26 @@ def main():
     
     args = parser.parse_args()
     
-    # Load environment variables
-    load_dotenv()
-    
     # Check PostgreSQL connection
     if not check_postgresql_connection():
         print("Failed to connect to PostgreSQL. Exiting.")
         return
     
     # Check if ports are already in use
-    if not args.frontend_only and not args.rasa_only and check_port_in_use(args.port):
+    ports_in_use = check_ports_in_use([args.port, args.frontend_port, 5005, 5055])
+    
+    if not args.frontend_only and not args.rasa_only and ports_in_use[args.port]:
         print(f"Warning: Port {args.port} is already in use. Backend may not start correctly.")
         print(f"Try using a different port with: python app.py --port {args.port + 1}")
     
-    if not args.backend_only and not args.rasa_only and check_port_in_use(args.frontend_port):
+    if not args.backend_only and not args.rasa_only and ports_in_use[args.frontend_port]:
         print(f"Warning: Port {args.frontend_port} is already in use. Frontend may not start correctly.")
         print(f"Try using a different port with: python app.py --frontend-port {args.frontend_port + 1}")
     
     if not args.backend_only and not args.frontend_only and not args.no_rasa:
-        if check_port_in_use(5005):
+        if ports_in_use[5005]:
             print("Warning: Port 5005 is already in use. Rasa server may not start correctly.")
-        if check_port_in_use(5055):
+        if ports_in_use[5055]:
             print("Warning: Port 5055 is already in use. Rasa Action server may not start correctly.")
     
     # Set environment variables for ports
@@ -181,46 +196,63 @@ def main():
     print("Password: password123")
     print("==============================================\n")
     
-    # Start the backend server in a separate thread if needed
+    processes = {}
+    
+    # Start the backend server if needed
     if run_backend_server:
-        backend_thread = threading.Thread(target=run_backend)
-        backend_thread.daemon = True
-        backend_thread.start()
+        processes["backend"] = run_backend()
         print(f"Backend server starting on http://localhost:{args.port}")
         
         # Wait a bit for the backend to start
         time.sleep(2)
     
-    # Start the Rasa bot in a separate thread if needed
+    # Start the Rasa bot if needed (this waits for the servers to initialize)
     if run_rasa_server:
-        rasa_thread = threading.Thread(target=run_rasa_bot)
-        rasa_thread.daemon = True
-        rasa_thread.start()
         print("Rasa chatbot starting...")
-        
-        # Wait a bit for the Rasa bot to start
-        time.sleep(3)
+        processes["rasa"], processes["action"] = run_rasa_bot()
     
     # Start the frontend server if needed
     if run_frontend_server:
         print(f"Frontend server starting on http://localhost:{args.frontend_port}")
+        processes["frontend"] = run_frontend()
         
         # Open browser
         try:
             webbrowser.open(f"http://localhost:{args.frontend_port}")
         except:
             print(f"Could not open browser automatically. Please navigate to: http://localhost:{args.frontend_port}")
-        
-        # Run frontend (this will block until frontend is stopped)
-        run_frontend()
-    elif run_backend_server or (run_rasa_server and not args.frontend_only):
-        # If only running backend or Rasa, keep the main thread alive
-        print("Press Ctrl+C to stop the server")
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("Shutting down...")
+    
+    processes = {name: process for name, process in processes.items() if process}
+    rasa_bot_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rasa_bot")
+    
+    # Wait on the child processes until the frontend stops or everything has exited
+    print("Press Ctrl+C to stop the server")
+    try:
+        while processes:
+            name = wait_for_exit(processes)
+            del processes[name]
+            
+            if name == "frontend":
+                break
+            
+            if name in RASA_COMMANDS:
+                print(f"{RASA_NAMES[name]} stopped unexpectedly. Restarting...")
+                try:
+                    processes[name] = subprocess.Popen(
+                        RASA_COMMANDS[name],
+                        cwd=rasa_bot_dir,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE
+                    )
+                except Exception as e:
+                    print(f"Error restarting {RASA_NAMES[name]}: {e}")
+            else:
+                print(f"The {name} server stopped.")
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        # Terminate any remaining child processes
+        stop_processes(processes)
     
     print("Application stopped")
 
@@ -1,35 +1,60 @@
 import sys
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
+from flask.json.provider import JSONProvider
+import orjson
 from flask_cors import CORS
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, update, select, exists, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import sessionmaker, scoped_session
 import time
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 
-# Add parent directory to path to import modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Get the absolute project root path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Add parent directory to path to import modules (once, even if this module is re-imported)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+from utils.env import load_env
 from utils.auth import hash_password, check_password, generate_token, decode_token, token_required
 from database.models import User, Conversation, Message
-from models.chatbot import Chatbot
 
 # Load environment variables
-load_dotenv()
-
-# Get the absolute project root path
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_env()
 
 # Database URL (default to SQLite for development)
 # Use absolute path for the SQLite database file
 DB_URL = os.getenv("DATABASE_URL")
 if not DB_URL or DB_URL.startswith("sqlite:///"):
-    DB_PATH = os.path.join(PROJECT_ROOT, "database", "chatbot.db")
+    DB_PATH = PROJECT_ROOT / "database" / "chatbot.db"
     DB_URL = f"sqlite:///{DB_PATH}"
     os.environ["DATABASE_URL"] = DB_URL
 
+# Port for the development server
+PORT = int(os.getenv("PORT", 5000))
+
+# Messages sent with the dashboard's newest conversation
+MESSAGE_PAGE_SIZE = 50
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider that encodes responses with orjson, including datetimes as ISO 8601 strings"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# Browser client served alongside the API
+STATIC_DIR = PROJECT_ROOT / "frontend" / "static"
+
 # Initialize Flask app
-app = Flask(__name__)
+app = Flask(__name__, static_folder=str(STATIC_DIR), static_url_path='/static')
+app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS
 
 # Set higher request timeout
@@ -41,18 +66,50 @@ engine_args = {}
 if "postgresql" in DB_URL:
     engine_args = {
         "pool_pre_ping": True,
-        "pool_recycle": 300,
+        "pool_recycle": 1800,
         "pool_size": 10,
         "max_overflow": 20,
+        "pool_use_lifo": True,  # Reuse the most recently returned (warm) connection
         "connect_args": {"connect_timeout": 30}
     }
     print("Configuring PostgreSQL connection settings for backend")
+elif DB_URL.startswith("sqlite"):
+    # Keep SQLite connections open between requests instead of reconnecting each time
+    engine_args = {
+        "poolclass": QueuePool,
+        "pool_size": 10,
+        "max_overflow": 10,
+        "connect_args": {"check_same_thread": False}
+    }
+
+# Statements for the hot endpoints, built once so their compiled SQL is reused from the cache
+USERNAME_EXISTS = select(exists().where(User.username == bindparam('username')))
+EMAIL_EXISTS = select(exists().where(User.email == bindparam('email')))
+USER_BY_USERNAME = select(User).where(User.username == bindparam('username'))
+USER_BY_ID = select(User).where(User.id == bindparam('user_id'))
+USER_CONVERSATION = select(Conversation).where(
+    Conversation.id == bindparam('conversation_id'),
+    Conversation.user_id == bindparam('user_id')
+)
+
+engine = create_engine(DB_URL, query_cache_size=1200, **engine_args)
+Session = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
 
-engine = create_engine(DB_URL, **engine_args)
-Session = sessionmaker(bind=engine)
+@lru_cache(maxsize=1)
+def get_chatbot():
+    """Create the chatbot on first use so importing the app does not load its models"""
+    from models.chatbot import Chatbot
+    return Chatbot(DB_URL)
 
-# Initialize chatbot
-chatbot = Chatbot(DB_URL)
+@app.teardown_appcontext
+def remove_session(exception=None):
+    """Release the thread-local database session at the end of each request"""
+    Session.remove()
+
+@app.route('/')
+def index():
+    """Serve the browser client"""
+    return send_from_directory(STATIC_DIR, 'index.html')
 
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -67,32 +124,32 @@ def register():
     if not all([username, email, password]):
         return jsonify({"error": "Username, email and password are required"}), 400
     
-    # Check if username or email already exists
-    session = Session()
-    existing_user = session.query(User).filter(
-        (User.username == username) | (User.email == email)
-    ).first()
-    
-    if existing_user:
-        session.close()
+    try:
+        with Session() as session, session.begin():
+            # Check if username or email already exists, probing each unique index separately
+            username_taken = session.execute(USERNAME_EXISTS, {"username": username}).scalar()
+            email_taken = username_taken or session.execute(EMAIL_EXISTS, {"email": email}).scalar()
+            
+            if username_taken or email_taken:
+                return jsonify({"error": "Username or email already exists"}), 400
+            
+            # Create new user
+            hashed_password = hash_password(password)
+            new_user = User(
+                username=username,
+                email=email,
+                password_hash=hashed_password
+            )
+            
+            session.add(new_user)
+            session.flush()
+    except IntegrityError:
+        # A concurrent registration took the username or email first
         return jsonify({"error": "Username or email already exists"}), 400
     
-    # Create new user
-    hashed_password = hash_password(password)
-    new_user = User(
-        username=username,
-        email=email,
-        password_hash=hashed_password
-    )
-    
-    session.add(new_user)
-    session.commit()
-    
     # Generate token
     token = generate_token(new_user.id, new_user.username)
     
-    session.close()
-    
     return jsonify({
         "message": "User registered successfully",
         "token": token,
@@ -115,23 +172,22 @@ def login():
     if not all([username, password]):
         return jsonify({"error": "Username and password are required"}), 400
     
-    # Check if user exists
-    session = Session()
-    user = session.query(User).filter(User.username == username).first()
-    
-    if not user or not check_password(password, user.password_hash):
-        session.close()
-        return jsonify({"error": "Invalid username or password"}), 401
-    
-    # Update last login
-    user.last_login = datetime.now()
-    session.commit()
+    with Session() as session, session.begin():
+        # Check if user exists
+        user = session.execute(USER_BY_USERNAME, {"username": username}).scalars().first()
+        
+        if not user or not check_password(password, user.password_hash):
+            return jsonify({"error": "Invalid username or password"}), 401
+        
+        # Update last login with the same local clock as the other timestamps
+        session.execute(
+            update(User).where(User.id == user.id).values(last_login=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
     
     # Generate token
     token = generate_token(user.id, user.username)
     
-    session.close()
-    
     return jsonify({
         "message": "Login successful",
         "token": token,
@@ -156,102 +212,262 @@ def chat(user_id, username):
         return jsonify({"error": "Message is required"}), 400
     
     # Process message with chatbot
-    response = chatbot.process_message(message, user_id, conversation_id)
+    response = get_chatbot().process_message(message, user_id, conversation_id)
     
     return jsonify(response), 200
 
-@app.route('/api/conversations', methods=['GET'])
+def sse_event(data):
+    """Encode a dict as a server-sent event frame"""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
 @token_required
-def get_conversations(user_id, username):
-    """Get all conversations for a user"""
-    session = Session()
+def chat_stream(user_id, username):
+    """
+    Process a chat message and send the reply as server-sent events
+    
+    The chatbot returns complete replies, so the whole text goes out as a single
+    token event; clients read it the same way as a reply streamed in pieces
+    """
+    # Get request data
+    data = request.get_json()
+    message = data.get('message')
+    conversation_id = data.get('conversation_id')
+    
+    # Validate input
+    if not message:
+        return jsonify({"error": "Message is required"}), 400
+    
+    def generate():
+        # The headers are already sent, so failures are reported as an error event
+        try:
+            response = get_chatbot().process_message(message, user_id, conversation_id)
+        except Exception as e:
+            yield sse_event({"error": f"Failed to process message: {e}"})
+            return
+        
+        # Send the conversation first, then the reply text
+        yield sse_event({
+            "conversation_id": response["conversation_id"],
+            "message_id": response.get("message_id")
+        })
+        yield sse_event({"token": response["text"]})
     
-    # Get conversations
-    conversations = session.query(Conversation).filter(
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def conversation_summaries(session, user_id):
+    """
+    List a user's conversations, newest first, each with its last message
+    
+    Args:
+        session: Database session
+        user_id (int): The user's ID
+    
+    Returns:
+        list: Conversation dicts
+    """
+    # Rank each conversation's messages newest first so the last message
+    # can be joined in the same query instead of one lookup per conversation
+    ranked_messages = session.query(
+        Message.conversation_id,
+        Message.content,
+        func.row_number().over(
+            partition_by=Message.conversation_id,
+            order_by=(Message.timestamp.desc(), Message.id.desc())
+        ).label("rank")
+    ).subquery()
+    
+    rows = session.query(Conversation, ranked_messages.c.content).outerjoin(
+        ranked_messages,
+        (ranked_messages.c.conversation_id == Conversation.id) & (ranked_messages.c.rank == 1)
+    ).filter(
         Conversation.user_id == user_id
     ).order_by(Conversation.start_time.desc()).all()
     
     # Convert to list of dictionaries
     result = []
-    for conv in conversations:
-        # Get last message
-        last_message = session.query(Message).filter(
-            Message.conversation_id == conv.id
-        ).order_by(Message.timestamp.desc()).first()
-        
+    for conv, last_message in rows:
         result.append({
             "id": conv.id,
-            "start_time": conv.start_time.isoformat(),
-            "end_time": conv.end_time.isoformat() if conv.end_time else None,
+            "start_time": conv.start_time,
+            "end_time": conv.end_time,
             "duration": conv.duration,
-            "last_message": last_message.content if last_message else None
+            "last_message": last_message
         })
     
-    session.close()
+    return result
+
+def message_page(session, conversation_id, limit, before=None):
+    """
+    Get the newest messages of a conversation, optionally only those sent before a time
+    
+    Args:
+        session: Database session
+        conversation_id (int): The conversation's ID
+        limit (int): Maximum number of messages to return
+        before (datetime): Only return messages sent before this time
+    
+    Returns:
+        tuple: Message dicts oldest first, and whether older messages exist
+    """
+    query = session.query(
+        Message.id, Message.is_user, Message.content, Message.timestamp
+    ).filter(Message.conversation_id == conversation_id)
+    if before is not None:
+        query = query.filter(Message.timestamp < before)
+    
+    # Fetch one extra row to tell whether there is an older page
+    rows = query.order_by(Message.timestamp.desc(), Message.id.desc()).limit(limit + 1).all()
+    return [row._asdict() for row in reversed(rows[:limit])], len(rows) > limit
+
+@app.route('/api/conversations', methods=['GET'])
+@token_required
+def get_conversations(user_id, username):
+    """Get all conversations for a user"""
+    with Session() as session:
+        result = conversation_summaries(session, user_id)
     
     return jsonify(result), 200
 
+@app.route('/api/dashboard', methods=['GET'])
+@token_required
+def get_dashboard(user_id, username):
+    """Get everything the dashboard shows in one request: the user, their conversations
+    with the messages of the most recent one, and the time of their latest message"""
+    with Session() as session:
+        user = session.execute(USER_BY_ID, {"user_id": user_id}).scalars().first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        
+        conversations = conversation_summaries(session, user_id)
+        
+        # Include the newest conversation's latest messages so opening it needs no further request
+        if conversations:
+            conversations[0]["messages"], conversations[0]["has_more"] = message_page(
+                session, conversations[0]["id"], MESSAGE_PAGE_SIZE
+            )
+        
+        latest_update = session.query(func.max(Message.timestamp)).join(
+            Conversation, Message.conversation_id == Conversation.id
+        ).filter(Conversation.user_id == user_id).scalar()
+    
+    return jsonify({
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email
+        },
+        "conversations": conversations,
+        "latest_update": latest_update
+    }), 200
+
 @app.route('/api/conversations/<int:conversation_id>', methods=['GET'])
 @token_required
 def get_conversation(user_id, username, conversation_id):
-    """Get a specific conversation"""
-    session = Session()
-    
-    # Check if conversation exists and belongs to user
-    conversation = session.query(Conversation).filter(
-        Conversation.id == conversation_id,
-        Conversation.user_id == user_id
-    ).first()
+    """
+    Get a specific conversation
+    
+    With a limit query parameter only the newest page of messages is returned,
+    optionally those sent before the time given as the before parameter
+    """
+    limit = request.args.get('limit', type=int)
+    before = request.args.get('before')
+    if before:
+        try:
+            before = datetime.fromisoformat(before.replace("Z", "+00:00"))
+        except ValueError:
+            return jsonify({"error": "Invalid before timestamp"}), 400
+    
+    with Session() as session:
+        # Check if conversation exists and belongs to user
+        conversation = session.execute(
+            USER_CONVERSATION, {"conversation_id": conversation_id, "user_id": user_id}
+        ).scalars().first()
     
     if not conversation:
-        session.close()
         return jsonify({"error": "Conversation not found"}), 404
     
-    # Get messages
-    messages = chatbot.get_conversation_history(conversation_id)
-    
-    session.close()
+    if limit:
+        with Session() as session:
+            messages, has_more = message_page(session, conversation_id, limit, before or None)
+        
+        return jsonify({
+            "id": conversation.id,
+            "start_time": conversation.start_time,
+            "end_time": conversation.end_time,
+            "duration": conversation.duration,
+            "messages": messages,
+            "has_more": has_more
+        }), 200
+    
+    def generate():
+        # Write the conversation fields, leaving the object open for the messages
+        header = orjson.dumps({
+            "id": conversation.id,
+            "start_time": conversation.start_time,
+            "end_time": conversation.end_time,
+            "duration": conversation.duration
+        })
+        yield header[:-1] + b',"messages":['
+        
+        # Stream messages in batches instead of building the whole history in memory
+        with Session() as session:
+            messages = session.query(
+                Message.id, Message.is_user, Message.content, Message.timestamp
+            ).filter(
+                Message.conversation_id == conversation_id
+            ).order_by(Message.timestamp).yield_per(200)
+            
+            for index, message in enumerate(messages):
+                if index:
+                    yield b','
+                yield orjson.dumps(message._asdict())
+        
+        yield b']}'
     
-    return jsonify({
-        "id": conversation.id,
-        "start_time": conversation.start_time.isoformat(),
-        "end_time": conversation.end_time.isoformat() if conversation.end_time else None,
-        "duration": conversation.duration,
-        "messages": messages
-    }), 200
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/api/conversations/<int:conversation_id>', methods=['PUT'])
 @token_required
 def end_conversation(user_id, username, conversation_id):
     """End a conversation"""
-    session = Session()
+    with Session() as session, session.begin():
+        # End the conversation in a single UPDATE; its duration is derived from the timestamps
+        result = session.execute(
+            update(Conversation).where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            ).values(end_time=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
     
     # Check if conversation exists and belongs to user
-    conversation = session.query(Conversation).filter(
-        Conversation.id == conversation_id,
-        Conversation.user_id == user_id
-    ).first()
-    
-    if not conversation:
-        session.close()
+    if result.rowcount == 0:
         return jsonify({"error": "Conversation not found"}), 404
     
-    # End conversation
-    conversation.end_time = datetime.now()
-    
-    # Calculate duration
-    if conversation.start_time:
-        duration = (conversation.end_time - conversation.start_time).total_seconds()
-        conversation.duration = duration
-    
-    session.commit()
-    session.close()
-    
     return jsonify({
         "message": "Conversation ended",
         "conversation_id": conversation_id
     }), 200
 
+def serve_app(port=PORT, debug=True):
+    """Serve the backend with waitress if installed, otherwise with the Flask development server"""
+    # Load the chatbot before accepting requests so the first chat is not slowed down
+    get_chatbot()
+    
+    try:
+        from waitress import serve
+    except ImportError:
+        print("waitress is not installed, using the Flask development server")
+        app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
+        return
+    
+    print(f"Serving backend with waitress on port {port}")
+    serve(app, host='0.0.0.0', port=port, threads=8)
+
 if __name__ == '__main__':
-    port = int(os.getenv("PORT", 5000))
-    app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
+    serve_app()
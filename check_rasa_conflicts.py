@@ -6,10 +6,8 @@ import sys
 import re
 import yaml
 import logging
-import glob
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Set, Tuple, Any, Optional
+import functools
+from typing import Dict, Tuple
 import collections
 
 # Configure logging
@@ -23,6 +21,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger("RasaConflictChecker")
 
+# Use the libyaml C parser when PyYAML was built with it
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# NLU files larger than this are parsed item by item instead of loaded whole
+STREAM_THRESHOLD = 10 * 1024 * 1024
+
+# Symbols referenced across the NLU, stories and rules files, collected in one pass
+ProjectSymbols = collections.namedtuple('ProjectSymbols', [
+    'nlu_intents', 'nlu_entities', 'intent_example_counts', 'has_regex', 'story_actions', 'story_slots'
+])
+
+# Parsed YAML files shared across checker instances: path -> ((mtime, size), data)
+_yaml_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
 # Configuration paths
 RASA_DIR = "."
 DATA_DIR = os.path.join(RASA_DIR, "data")
@@ -33,6 +45,60 @@ RULES_PATH = os.path.join(DATA_DIR, "rules.yml")
 ACTIONS_PATH = os.path.join(RASA_DIR, "actions.py")
 CONFIG_PATH = os.path.join(RASA_DIR, "config.yml")
 
+# Entity annotations in NLU examples, e.g. [blue](color)
+ENTITY_RE = re.compile(r'\[[^\]]*?\]\((\w+)\)')
+# Class definitions in actions.py
+CLASS_RE = re.compile(r'^\s*class\s+(\w+)\s*\(', re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=4096)
+def action_class_name(action: str) -> str:
+    """Class name expected in actions.py for a custom action, e.g. action_check_order -> ActionCheckOrder"""
+    return ''.join(word.capitalize() for word in action.split('_'))
+
+
+@functools.lru_cache(maxsize=8)
+def _defined_classes(path: str, mtime_ns: int, size: int) -> frozenset:
+    """Class names defined in a Python file, cached until the file's mtime or size changes"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(CLASS_RE.findall(f.read()))
+
+
+def iter_yaml_list_items(file_path: str, key: str):
+    """
+    Stream the items of a top-level list in a YAML file without loading the whole document.
+    
+    Args:
+        file_path: Path to the YAML file
+        key: Top-level key holding the list, e.g. 'nlu'
+        
+    Yields:
+        Each list item, constructed as soon as it has been parsed
+    """
+    with open(file_path, 'rb') as file:
+        # The pure-Python loader is used because it can compose one node at a time
+        loader = yaml.SafeLoader(file)
+        try:
+            loader.get_event()  # StreamStart
+            if not loader.check_event(yaml.DocumentStartEvent):
+                return
+            loader.get_event()
+            if not loader.check_event(yaml.MappingStartEvent):
+                return
+            loader.get_event()
+            
+            while not loader.check_event(yaml.MappingEndEvent):
+                item_key = loader.construct_document(loader.compose_node(None, None))
+                if item_key == key and loader.check_event(yaml.SequenceStartEvent):
+                    loader.get_event()
+                    while not loader.check_event(yaml.SequenceEndEvent):
+                        yield loader.construct_document(loader.compose_node(None, None))
+                    loader.get_event()
+                else:
+                    loader.compose_node(None, None)
+        finally:
+            loader.dispose()
+
 
 class ConflictChecker:
     """
@@ -47,7 +113,11 @@ class ConflictChecker:
         self.config_data = {}
         self.issue_count = 0
         self.warnings = 0
-        self.details = []
+        # Report lines, kept apart so the report needs no filtering pass
+        self.issue_details = collections.deque()
+        self.warning_details = collections.deque()
+        self._symbols = None
+        self.nlu_stream_path = None
         
         # Load all YAML files
         self._load_all_files()
@@ -67,22 +137,89 @@ class ConflictChecker:
                 logger.warning(f"File {file_path} does not exist")
                 return {}
                 
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return yaml.safe_load(file) or {}
+            # Reuse the parsed data while the file is unchanged; checks only read it
+            path = os.path.abspath(file_path)
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = _yaml_cache.get(path)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            
+            with open(path, 'rb') as file:
+                data = yaml.load(file.read(), Loader=YamlLoader) or {}
+            _yaml_cache[path] = (stamp, data)
+            return data
         except Exception as e:
             logger.error(f"Error loading {file_path}: {str(e)}")
             self.issue_count += 1
-            self.details.append(f"ERROR: Could not load {file_path}. {str(e)}")
+            self.issue_details.append(f"ERROR: Could not load {file_path}. {str(e)}")
             return {}
     
     def _load_all_files(self) -> None:
         """Load all required Rasa configuration files."""
         self.domain_data = self._load_yaml(DOMAIN_PATH)
-        self.nlu_data = self._load_yaml(NLU_PATH)
+        if os.path.exists(NLU_PATH) and os.path.getsize(NLU_PATH) > STREAM_THRESHOLD:
+            # Large NLU files are streamed in _collect_symbols to keep memory flat
+            self.nlu_stream_path = NLU_PATH
+        else:
+            self.nlu_data = self._load_yaml(NLU_PATH)
         self.stories_data = self._load_yaml(STORIES_PATH)
         self.rules_data = self._load_yaml(RULES_PATH)
         self.config_data = self._load_yaml(CONFIG_PATH)
     
+    def _collect_symbols(self) -> ProjectSymbols:
+        """
+        Collect the intents, entities, actions and slots used in the training data.
+        
+        NLU items and story/rule steps are each walked once and the result is
+        cached, so the individual checks only do set arithmetic.
+        
+        Returns:
+            ProjectSymbols with the collected sets and example counts
+        """
+        if self._symbols is not None:
+            return self._symbols
+        
+        nlu_intents = set()
+        nlu_entities = set()
+        intent_example_counts = {}
+        has_regex = False
+        if self.nlu_stream_path:
+            nlu_items = iter_yaml_list_items(self.nlu_stream_path, 'nlu')
+        else:
+            nlu_items = self.nlu_data.get('nlu', [])
+        
+        for item in nlu_items:
+            intent = item.get('intent')
+            if intent:
+                nlu_intents.add(intent)
+            if 'examples' in item:
+                examples_text = item['examples']
+                for match in ENTITY_RE.finditer(examples_text):
+                    nlu_entities.add(match.group(1))
+                if intent:
+                    intent_example_counts[intent] = examples_text.count('- ')
+            if 'regex' in item:
+                has_regex = True
+        
+        story_actions = set()
+        story_slots = set()
+        for story in self.stories_data.get('stories', []) + self.rules_data.get('rules', []):
+            for step in story.get('steps', []):
+                if 'action' in step:
+                    story_actions.add(step['action'])
+                if 'slot_was_set' in step:
+                    for slot_item in step['slot_was_set']:
+                        if isinstance(slot_item, dict):
+                            story_slots.update(slot_item.keys())
+                        else:
+                            story_slots.add(slot_item)
+        
+        self._symbols = ProjectSymbols(
+            nlu_intents, nlu_entities, intent_example_counts, has_regex, story_actions, story_slots
+        )
+        return self._symbols
+    
     def check_missing_intents(self) -> int:
         """
         Check for intents that are defined in NLU but missing in domain, or vice versa.
@@ -98,24 +235,21 @@ class ConflictChecker:
             logger.warning("No intents defined in domain.yml")
         
         # Extract intents from NLU
-        nlu_intents = set()
-        for example in self.nlu_data.get('nlu', []):
-            if example.get('intent'):
-                nlu_intents.add(example.get('intent'))
+        nlu_intents = self._collect_symbols().nlu_intents
         
         # Check for intents in NLU but not in domain
         missing_in_domain = nlu_intents - domain_intents
         if missing_in_domain:
             issues_count += len(missing_in_domain)
             logger.warning(f"Intents found in NLU but missing in domain: {', '.join(missing_in_domain)}")
-            self.details.append(f"ISSUE: Intents in NLU but missing in domain: {', '.join(missing_in_domain)}")
+            self.issue_details.append(f"ISSUE: Intents in NLU but missing in domain: {', '.join(missing_in_domain)}")
         
         # Check for intents in domain but not in NLU
         missing_in_nlu = domain_intents - nlu_intents
         if missing_in_nlu:
             issues_count += len(missing_in_nlu)
             logger.warning(f"Intents found in domain but missing in NLU: {', '.join(missing_in_nlu)}")
-            self.details.append(f"ISSUE: Intents in domain but missing in NLU: {', '.join(missing_in_nlu)}")
+            self.issue_details.append(f"ISSUE: Intents in domain but missing in NLU: {', '.join(missing_in_nlu)}")
         
         return issues_count
     
@@ -133,16 +267,7 @@ class ConflictChecker:
         domain_actions = set(self.domain_data.get('actions', []))
         
         # Extract actions from stories and rules
-        story_actions = set()
-        for story in self.stories_data.get('stories', []):
-            for step in story.get('steps', []):
-                if 'action' in step:
-                    story_actions.add(step['action'])
-        
-        for rule in self.rules_data.get('rules', []):
-            for step in rule.get('steps', []):
-                if 'action' in step:
-                    story_actions.add(step['action'])
+        story_actions = self._collect_symbols().story_actions
         
         # Check for actions in stories/rules but not in domain
         missing_in_domain = story_actions - domain_actions
@@ -151,21 +276,20 @@ class ConflictChecker:
         if missing_in_domain:
             issues_count += len(missing_in_domain)
             logger.warning(f"Actions used in stories/rules but missing in domain: {', '.join(missing_in_domain)}")
-            self.details.append(f"ISSUE: Actions used in stories/rules but not defined: {', '.join(missing_in_domain)}")
+            self.issue_details.append(f"ISSUE: Actions used in stories/rules but not defined: {', '.join(missing_in_domain)}")
         
         # Check for custom actions without implementation
         if os.path.exists(ACTIONS_PATH):
-            with open(ACTIONS_PATH, 'r', encoding='utf-8') as f:
-                actions_content = f.read()
+            stat = os.stat(ACTIONS_PATH)
+            defined_classes = _defined_classes(os.path.abspath(ACTIONS_PATH), stat.st_mtime_ns, stat.st_size)
             
             custom_actions = {action for action in domain_actions if action.startswith('action_') and not action == 'action_restart'}
             
             for action in custom_actions:
-                class_name = 'class ' + ''.join(word.capitalize() for word in action.split('_')) + '('
-                if class_name not in actions_content:
+                if action_class_name(action) not in defined_classes:
                     issues_count += 1
                     logger.warning(f"Custom action {action} is defined in domain but has no implementation in actions.py")
-                    self.details.append(f"ISSUE: Custom action {action} is defined in domain but has no implementation in actions.py")
+                    self.issue_details.append(f"ISSUE: Custom action {action} is defined in domain but has no implementation in actions.py")
         
         return issues_count
     
@@ -182,19 +306,14 @@ class ConflictChecker:
         domain_entities = set(self.domain_data.get('entities', []))
         
         # Extract entities from NLU
-        nlu_entities = set()
-        for example in self.nlu_data.get('nlu', []):
-            if 'examples' in example:
-                entity_pattern = r'\[.*?\]\((\w+)\)'
-                for match in re.finditer(entity_pattern, example['examples']):
-                    nlu_entities.add(match.group(1))
+        nlu_entities = self._collect_symbols().nlu_entities
         
         # Check for entities in NLU but not in domain
         missing_in_domain = nlu_entities - domain_entities
         if missing_in_domain:
             issues_count += len(missing_in_domain)
             logger.warning(f"Entities found in NLU but missing in domain: {', '.join(missing_in_domain)}")
-            self.details.append(f"ISSUE: Entities used in NLU but missing in domain: {', '.join(missing_in_domain)}")
+            self.issue_details.append(f"ISSUE: Entities used in NLU but missing in domain: {', '.join(missing_in_domain)}")
         
         return issues_count
     
@@ -211,34 +330,14 @@ class ConflictChecker:
         domain_slots = set(self.domain_data.get('slots', {}).keys())
         
         # Extract slots from stories and rules
-        story_slots = set()
-        
-        # Check stories
-        for story in self.stories_data.get('stories', []):
-            for step in story.get('steps', []):
-                if 'slot_was_set' in step:
-                    for slot_item in step['slot_was_set']:
-                        if isinstance(slot_item, dict):
-                            story_slots.update(slot_item.keys())
-                        else:
-                            story_slots.add(slot_item)
-        
-        # Check rules
-        for rule in self.rules_data.get('rules', []):
-            for step in rule.get('steps', []):
-                if 'slot_was_set' in step:
-                    for slot_item in step['slot_was_set']:
-                        if isinstance(slot_item, dict):
-                            story_slots.update(slot_item.keys())
-                        else:
-                            story_slots.add(slot_item)
+        story_slots = self._collect_symbols().story_slots
         
         # Check for slots in stories/rules but not in domain
         missing_in_domain = story_slots - domain_slots
         if missing_in_domain:
             issues_count += len(missing_in_domain)
             logger.warning(f"Slots used in stories/rules but missing in domain: {', '.join(missing_in_domain)}")
-            self.details.append(f"ISSUE: Slots used in stories/rules but not defined in domain: {', '.join(missing_in_domain)}")
+            self.issue_details.append(f"ISSUE: Slots used in stories/rules but not defined in domain: {', '.join(missing_in_domain)}")
         
         return issues_count
     
@@ -252,13 +351,7 @@ class ConflictChecker:
         issues_count = 0
         
         # Check if regex features are defined in NLU
-        has_regex = False
-        for item in self.nlu_data.get('nlu', []):
-            if 'regex' in item:
-                has_regex = True
-                break
-        
-        if has_regex:
+        if self._collect_symbols().has_regex:
             # Check if RegexEntityExtractor is in pipeline
             pipeline = self.config_data.get('pipeline', [])
             has_regex_extractor = False
@@ -274,7 +367,7 @@ class ConflictChecker:
             if not has_regex_extractor:
                 issues_count += 1
                 logger.warning("Regex features are used in NLU but RegexEntityExtractor is not in the pipeline")
-                self.details.append("ISSUE: Regex features are used in NLU but RegexEntityExtractor is not configured in pipeline")
+                self.issue_details.append("ISSUE: Regex features are used in NLU but RegexEntityExtractor is not configured in pipeline")
         
         return issues_count
     
@@ -287,8 +380,10 @@ class ConflictChecker:
         """
         issues_count = 0
         
-        # Extract stories with same starting conditions
+        # Extract stories with same starting conditions, keyed by tuples of interned
+        # step token ids so no path strings are built or hashed per story
         story_paths = {}
+        token_ids: Dict[str, int] = {}
         
         for story in self.stories_data.get('stories', []):
             if story.get('steps') and len(story.get('steps')) >= 2:
@@ -296,23 +391,26 @@ class ConflictChecker:
                 first_steps = []
                 for step in story.get('steps')[:2]:
                     if 'intent' in step:
-                        first_steps.append(f"intent:{step['intent']}")
+                        first_steps.append(token_ids.setdefault(f"intent:{step['intent']}", len(token_ids)))
                     if 'action' in step:
-                        first_steps.append(f"action:{step['action']}")
+                        first_steps.append(token_ids.setdefault(f"action:{step['action']}", len(token_ids)))
                 
                 if first_steps:
-                    path_key = '->'.join(first_steps)
+                    path_key = tuple(first_steps)
                     if path_key in story_paths:
                         story_paths[path_key].append(story.get('story'))
                     else:
                         story_paths[path_key] = [story.get('story')]
         
+        tokens = list(token_ids)
+        
         # Report potential conflicts
-        for path, stories in story_paths.items():
+        for path_key, stories in story_paths.items():
             if len(stories) > 1:
                 issues_count += 1
+                path = '->'.join(tokens[token_id] for token_id in path_key)
                 logger.warning(f"Potential story conflict: {len(stories)} stories start with the same path ({path}): {', '.join(stories)}")
-                self.details.append(f"WARNING: Potential story conflict: {len(stories)} stories start with the same path ({path}): {', '.join(stories)}")
+                self.warning_details.append(f"WARNING: Potential story conflict: {len(stories)} stories start with the same path ({path}): {', '.join(stories)}")
         
         return issues_count
     
@@ -321,18 +419,12 @@ class ConflictChecker:
         Check for imbalanced training data in NLU.
         
         Returns:
-            Number of issues found
+            Number of warnings found
         """
-        issues_count = 0
+        warnings_count = 0
         
         # Count examples per intent
-        intent_examples = {}
-        for example in self.nlu_data.get('nlu', []):
-            if example.get('intent') and 'examples' in example:
-                intent = example.get('intent')
-                examples_text = example.get('examples')
-                count = len(re.findall(r'- ', examples_text))
-                intent_examples[intent] = count
+        intent_examples = self._collect_symbols().intent_example_counts
         
         if intent_examples:
             # Calculate statistics
@@ -348,21 +440,21 @@ class ConflictChecker:
                     few_examples.append(f"{intent} ({count})")
             
             if few_examples:
-                issues_count += len(few_examples)
+                warnings_count += len(few_examples)
                 logger.warning(f"Intents with too few examples (<3): {', '.join(few_examples)}")
-                self.details.append(f"WARNING: Intents with too few examples: {', '.join(few_examples)}")
+                self.warning_details.append(f"WARNING: Intents with too few examples: {', '.join(few_examples)}")
             
             # Check for high imbalance
             if max_count > 5 * min_count:
-                issues_count += 1
+                warnings_count += 1
                 most_examples = max(intent_examples.items(), key=lambda x: x[1])
                 least_examples = min(intent_examples.items(), key=lambda x: x[1])
                 logger.warning(f"High intent imbalance: {most_examples[0]} has {most_examples[1]} examples " +
                               f"while {least_examples[0]} has only {least_examples[1]}")
-                self.details.append(f"WARNING: High intent imbalance: {most_examples[0]} has {most_examples[1]} examples " +
+                self.warning_details.append(f"WARNING: High intent imbalance: {most_examples[0]} has {most_examples[1]} examples " +
                               f"while {least_examples[0]} has only {least_examples[1]}")
         
-        return issues_count
+        return warnings_count
     
     def run_all_checks(self) -> int:
         """
@@ -375,7 +467,8 @@ class ConflictChecker:
         
         self.issue_count = 0
         self.warnings = 0
-        self.details = []
+        self.issue_details.clear()
+        self.warning_details.clear()
         
         # Run all checks
         self.issue_count += self.check_missing_intents()
@@ -384,7 +477,6 @@ class ConflictChecker:
         self.issue_count += self.check_missing_slots()
         self.issue_count += self.check_regex_configuration()
         self.issue_count += self.check_story_conflicts()
-        self.issue_count += self.check_training_data_imbalance()
         
         # Run checks that produce warnings
         self.warnings += self.check_training_data_imbalance()
@@ -405,15 +497,13 @@ class ConflictChecker:
         
         if self.issue_count > 0:
             logger.info(f"Found {self.issue_count} issues that need to be fixed:")
-            for detail in self.details:
-                if detail.startswith("ISSUE:") or detail.startswith("ERROR:"):
-                    logger.info(f"  - {detail}")
+            for detail in self.issue_details:
+                logger.info(f"  - {detail}")
         
         if self.warnings > 0:
             logger.info(f"Found {self.warnings} warnings to consider:")
-            for detail in self.details:
-                if detail.startswith("WARNING:"):
-                    logger.info(f"  - {detail}")
+            for detail in self.warning_details:
+                logger.info(f"  - {detail}")
         
         logger.info("\nRECOMMENDED NEXT STEPS:")
         if self.issue_count > 0:
@@ -0,0 +1,51 @@
+from sqlalchemy import event
+
+# PostgreSQL session settings for bulk loads: commits do not wait for the WAL flush,
+# and index rebuilds and sorts get enough memory to stay off disk
+BULK_LOAD_SETTINGS = {
+    "synchronous_commit": "off",
+    "maintenance_work_mem": "512MB",
+    "work_mem": "64MB"
+}
+
+# SQLite pragmas for bulk loads: write-ahead logging synced at checkpoints instead of
+# every commit, in-memory temp tables and a ~200 MB page cache
+SQLITE_BULK_LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": "-200000"
+}
+
+# libpq TCP keepalives for script connections, which detect dead connections
+# without a pool pre-ping query on every checkout
+KEEPALIVE_CONNECT_ARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5
+}
+
+def tune_for_bulk_load(engine):
+    """
+    Apply the bulk load settings for the engine's database to every connection it opens.
+    They are per-connection settings (WAL mode aside), so they end with the script's connections.
+    
+    Args:
+        engine: SQLAlchemy engine for PostgreSQL or SQLite; other databases are left as they are
+    """
+    if engine.dialect.name == 'postgresql':
+        statements = [f"SET {name} = '{value}'" for name, value in BULK_LOAD_SETTINGS.items()]
+    elif engine.dialect.name == 'sqlite':
+        statements = [f"PRAGMA {name}={value}" for name, value in SQLITE_BULK_LOAD_PRAGMAS.items()]
+    else:
+        return
+    
+    @event.listens_for(engine, "connect")
+    def apply_bulk_load_settings(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+        # Commit so the pool's rollback on checkin does not undo the settings
+        dbapi_connection.commit()
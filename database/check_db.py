@@ -1,15 +1,14 @@
 import os
 import sys
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, select
 
 # Add parent directory to path to import models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.env import load_env
 from database.models import Base, User, Conversation, Message, Company, SupportData, Order, OrderItem
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Get database URL
 DB_URL = os.getenv("DATABASE_URL")
@@ -19,49 +18,74 @@ if not DB_URL:
 
 print(f"Using database URL: {DB_URL}")
 
+# Rows shown per table to avoid output overload
+PREVIEW_LIMIT = 5
+
+def count_rows(conn, column):
+    """Count the rows of a table on the server"""
+    return conn.execute(select(func.count(column))).scalar()
+
+def print_remaining(total, shown):
+    """Print how many rows were left out of a preview"""
+    if total > shown:
+        print(f"  ... and {total - shown} more")
+
 # Create database engine
 engine = create_engine(DB_URL)
-Session = sessionmaker(bind=engine)
-session = Session()
+
+# Read through a single Core connection; no ORM objects are needed, and
+# stream_results keeps the previews on a server-side cursor where supported
+conn = engine.connect().execution_options(stream_results=True)
 
 try:
     # Check users
-    users = session.query(User).all()
-    print(f"\nUsers ({len(users)}):")
+    total = count_rows(conn, User.id)
+    users = conn.execute(select(User.id, User.username, User.email).limit(PREVIEW_LIMIT)).all()
+    print(f"\nUsers ({total}):")
     for user in users:
         print(f"  - ID: {user.id}, Username: {user.username}, Email: {user.email}")
+    print_remaining(total, len(users))
 
     # Check companies
-    companies = session.query(Company).all()
-    print(f"\nCompanies ({len(companies)}):")
+    total = count_rows(conn, Company.id)
+    companies = conn.execute(select(Company.id, Company.name).limit(PREVIEW_LIMIT)).all()
+    print(f"\nCompanies ({total}):")
     for company in companies:
         print(f"  - ID: {company.id}, Name: {company.name}")
+    print_remaining(total, len(companies))
         
     # Check support data
-    support_data = session.query(SupportData).all()
-    print(f"\nSupport Data ({len(support_data)}):")
+    total = count_rows(conn, SupportData.id)
+    support_data = conn.execute(select(
+        SupportData.id, SupportData.company_id, SupportData.question, SupportData.answer
+    ).limit(PREVIEW_LIMIT)).all()
+    print(f"\nSupport Data ({total}):")
     for data in support_data:
         print(f"  - ID: {data.id}, Company ID: {data.company_id}")
         print(f"    Q: {data.question}")
         print(f"    A: {data.answer}")
+    print_remaining(total, len(support_data))
         
     # Check conversations
-    conversations = session.query(Conversation).all()
-    print(f"\nConversations ({len(conversations)}):")
+    total = count_rows(conn, Conversation.id)
+    conversations = conn.execute(select(Conversation.id, Conversation.user_id).limit(PREVIEW_LIMIT)).all()
+    print(f"\nConversations ({total}):")
     for conv in conversations:
         print(f"  - ID: {conv.id}, User ID: {conv.user_id}")
+    print_remaining(total, len(conversations))
         
     # Check messages
-    messages = session.query(Message).all()
-    print(f"\nMessages ({len(messages)}):")
-    for i, msg in enumerate(messages):
-        if i < 5:  # Only show first 5 messages to avoid output overload
-            print(f"  - ID: {msg.id}, Conversation ID: {msg.conversation_id}, User: {msg.is_user}")
-            print(f"    Content: {msg.content[:50]}...")
-    if len(messages) > 5:
-        print(f"  ... and {len(messages) - 5} more messages")
+    total = count_rows(conn, Message.id)
+    messages = conn.execute(select(
+        Message.id, Message.conversation_id, Message.is_user, Message.content
+    ).limit(PREVIEW_LIMIT)).all()
+    print(f"\nMessages ({total}):")
+    for msg in messages:
+        print(f"  - ID: {msg.id}, Conversation ID: {msg.conversation_id}, User: {msg.is_user}")
+        print(f"    Content: {msg.content[:50]}...")
+    print_remaining(total, len(messages))
         
 except Exception as e:
     print(f"Error querying database: {e}")
 finally:
-    session.close() 
\ No newline at end of file
+    conn.close() 
\ No newline at end of file
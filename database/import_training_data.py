@@ -6,17 +6,100 @@ This script is used to populate the SupportData table with training examples.
 
 import os
 import sys
-import json
 import argparse
-from sqlalchemy import create_engine
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
 
 # Add parent directory to path to import database models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database.models import Base, SupportData, Company
+from utils.env import load_env
+from database.models import Base, SupportData, Company, SUPPORT_DATA_QUESTION_INDEX
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+DIALECT_INSERTS = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}
+
+# Rows per multi-row INSERT statement
+BATCH_SIZE = 500
+
+# Rows fetched per round trip when loading existing questions
+SEEN_QUESTIONS_CHUNK_SIZE = 10000
+
+def ensure_question_index(session):
+    """
+    Make sure the unique (company_id, question) index exists so the database can skip duplicates
+    
+    Args:
+        session: SQLAlchemy session
+    
+    Returns:
+        bool: True if duplicate questions are skipped by the database on insert
+    """
+    if 'question_index' not in session.info:
+        dialect = session.get_bind().dialect.name
+        session.info['question_index'] = False
+        if dialect in SUPPORT_DATA_QUESTION_INDEX:
+            try:
+                session.execute(text(SUPPORT_DATA_QUESTION_INDEX[dialect]))
+                session.commit()
+                session.info['question_index'] = True
+            except SQLAlchemyError as e:
+                session.rollback()
+                print(f"Could not create unique question index, checking duplicates in Python instead: {e}")
+    
+    return session.info['question_index']
+
+def insert_support_data(session, rows):
+    """
+    Insert support data rows in batches
+    
+    Args:
+        session: SQLAlchemy session
+        rows (list): Dictionaries of SupportData column values
+    
+    Returns:
+        int: Number of rows inserted
+    """
+    if not rows:
+        return 0
+    
+    if not ensure_question_index(session):
+        session.execute(insert(SupportData), rows)
+        return len(rows)
+    
+    # Let the unique index drop questions that already exist
+    dialect_insert = DIALECT_INSERTS[session.get_bind().dialect.name]
+    count = 0
+    for start in range(0, len(rows), BATCH_SIZE):
+        statement = dialect_insert(SupportData).values(rows[start:start + BATCH_SIZE]).on_conflict_do_nothing()
+        count += session.execute(statement).rowcount
+    return count
+
+def parse_json_file(file_path):
+    """
+    Parse a training data JSON file without touching the database, so it can run in a worker process
+    
+    Args:
+        file_path (str): Path to the JSON file
+    
+    Returns:
+        list: (question, answer, category) tuples
+    """
+    with open(file_path, 'rb') as f:
+        data = _loads(f.read())
+    return [(item['question'], item['answer'], item.get('category', 'General')) for item in data]
 
-def import_from_json(file_path, session, company_id=1):
+def import_from_json(file_path, session, company_id=1, commit=True, items=None):
     """
     Import training data from a JSON file into the SupportData table
     
@@ -24,14 +107,17 @@ def import_from_json(file_path, session, company_id=1):
         file_path (str): Path to the JSON file
         session: SQLAlchemy session
         company_id (int): Company ID to associate with the data
+        commit (bool): Commit after the file; when False the caller owns the
+            transaction and errors are re-raised so it can roll back the batch
+        items (list): (question, answer, category) tuples already parsed from the file
     
     Returns:
         int: Number of records imported
     """
     try:
-        # Load JSON data
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Load JSON data unless it was parsed ahead of time
+        if items is None:
+            items = parse_json_file(file_path)
         
         # Check if company exists
         company = session.query(Company).filter_by(id=company_id).first()
@@ -46,41 +132,53 @@ def import_from_json(file_path, session, company_id=1):
                 website="https://example.com"
             )
             session.add(company)
-            session.commit()
+            if commit:
+                session.commit()
+            else:
+                session.flush()
             print(f"Created default company with ID {company_id}")
         
         # Count existing records to avoid duplicates
         existing_count = session.query(SupportData).count()
         print(f"Found {existing_count} existing support data records")
         
-        # Import data
-        import_count = 0
-        for item in data:
-            # Check if question already exists
-            existing = session.query(SupportData).filter_by(
-                question=item['question'],
-                company_id=company_id
-            ).first()
-            
-            if not existing:
-                support_data = SupportData(
-                    company_id=company_id,
-                    question=item['question'],
-                    answer=item['answer'],
-                    category=item.get('category', 'General')
-                )
-                session.add(support_data)
-                import_count += 1
+        if ensure_question_index(session):
+            seen_questions = set()
+        else:
+            # Without the unique index, load the company's existing questions to skip duplicates,
+            # streaming them in chunks rather than buffering the whole result
+            seen_questions = {
+                question for (question,) in session.query(SupportData.question)
+                .filter_by(company_id=company_id)
+                .yield_per(SEEN_QUESTIONS_CHUNK_SIZE)
+            }
+        
+        # Collect new records, skipping questions repeated earlier in the file
+        rows = []
+        for question, answer, category in items:
+            if question in seen_questions:
+                continue
+            seen_questions.add(question)
+            rows.append({
+                'company_id': company_id,
+                'question': question,
+                'answer': answer,
+                'category': category
+            })
         
-        # Commit changes
-        session.commit()
+        # Insert the new records in batches and commit
+        import_count = insert_support_data(session, rows)
+        if commit:
+            session.commit()
         print(f"Imported {import_count} new records from {file_path}")
         
         return import_count
     
     except Exception as e:
-        session.rollback()
         print(f"Error importing data from {file_path}: {e}")
+        if not commit:
+            raise
+        session.rollback()
         return 0
 
 def main():
@@ -97,7 +195,7 @@ def main():
         parser.error("Either --file or --dir must be specified")
     
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Get database URL from environment variable
     db_url = os.getenv("DATABASE_URL")
@@ -107,7 +205,7 @@ def main():
     
     # Create database engine and session
     engine = create_engine(db_url)
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
     session = Session()
     
     try:
@@ -117,6 +215,9 @@ def main():
             session.commit()
             print(f"Cleared {count} existing support data records")
         
+        # Create the unique question index up front, outside any import transaction
+        ensure_question_index(session)
+        
         # Total import count
         total_import_count = 0
         
@@ -134,10 +235,16 @@ def main():
                 print(f"Error: Directory {args.dir} does not exist")
                 sys.exit(1)
             
-            for filename in os.listdir(args.dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(args.dir, filename)
-                    total_import_count += import_from_json(file_path, session, args.company)
+            with os.scandir(args.dir) as entries:
+                file_paths = [entry.path for entry in entries if entry.is_file() and entry.name.endswith('.json')]
+            
+            # Parse files in worker processes while this process does the inserts, importing
+            # the whole directory in one transaction that is rolled back if any file fails
+            with session.begin(), ProcessPoolExecutor() as pool:
+                # A single file is parsed in-process to skip the worker startup
+                parse = pool.map if len(file_paths) > 1 else map
+                for file_path, items in zip(file_paths, parse(parse_json_file, file_paths)):
+                    total_import_count += import_from_json(file_path, session, args.company, commit=False, items=items)
         
         print(f"Import completed. Added {total_import_count} new records.")
     
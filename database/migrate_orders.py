@@ -1,29 +1,59 @@
 import os
 import sys
-from datetime import datetime, timedelta
-import random
-from dotenv import load_dotenv
+import asyncio
+import csv
+import io
+from datetime import datetime
+import numpy as np
 import argparse
 
 # Add parent directory to path to access our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.paths import DB_URL, ENV_DB_URL
 from database.models import Base, Order, OrderItem, OrderStatus, User
-from sqlalchemy import create_engine
+from database.bulk_load import BULK_LOAD_SETTINGS, KEEPALIVE_CONNECT_ARGS, tune_for_bulk_load
+from sqlalchemy import create_engine, func, insert, select
 from sqlalchemy.orm import sessionmaker
 
-# Load environment variables
-load_dotenv()
+# asyncpg loads rows with binary COPY when installed; psycopg2's CSV COPY is used otherwise
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+# Sample products with price ranges
+PRODUCTS = [
+    {"name": "Smartphone X", "price_range": (499.99, 1299.99)},
+    {"name": "Laptop Pro", "price_range": (899.99, 2499.99)},
+    {"name": "Wireless Headphones", "price_range": (79.99, 349.99)},
+    {"name": "Smart Watch", "price_range": (199.99, 499.99)},
+    {"name": "Tablet Ultra", "price_range": (329.99, 999.99)},
+    {"name": "Gaming Console", "price_range": (299.99, 599.99)},
+    {"name": "Digital Camera", "price_range": (249.99, 1499.99)},
+    {"name": "Bluetooth Speaker", "price_range": (59.99, 299.99)},
+    {"name": "Fitness Tracker", "price_range": (49.99, 149.99)},
+    {"name": "4K Monitor", "price_range": (199.99, 799.99)}
+]
+
+# Order statuses, biased towards being complete
+STATUS_CHOICES = [
+    OrderStatus.PENDING,
+    OrderStatus.PROCESSING,
+    OrderStatus.SHIPPED,
+    OrderStatus.DELIVERED,
+    OrderStatus.CANCELLED,
+    OrderStatus.BACKORDERED
+]
+STATUS_WEIGHTS = [0.1, 0.2, 0.2, 0.3, 0.1, 0.1]  # More likely to be delivered
+
+# Order numbers are five digits (ORD-10000 to ORD-99999) unless more are needed
+ORDER_NUMBER_START = 10000
+ORDER_NUMBER_SPACE = 90000
 
 def create_order_tables():
     """Create orders tables in the database"""
-    # Get project root path
-    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
     # Database URL
-    DB_URL = os.getenv("DATABASE_URL")
-    if not DB_URL:
-        DB_PATH = os.path.join(PROJECT_ROOT, "database", "chatbot.db")
-        DB_URL = f"sqlite:///{DB_PATH}"
+    if not ENV_DB_URL:
         print(f"No DATABASE_URL found in .env, defaulting to SQLite: {DB_URL}")
     else:
         print(f"Using database URL from .env: {DB_URL}")
@@ -34,19 +64,21 @@ def create_order_tables():
             db_path = DB_URL.replace("sqlite:///", "")
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        # Configure PostgreSQL settings if using PostgreSQL
+        # Configure PostgreSQL settings if using PostgreSQL; the script uses one
+        # connection at a time, so a single pooled connection without pre-ping is enough
         engine_args = {}
         if "postgresql" in DB_URL:
             engine_args = {
-                "pool_pre_ping": True,
                 "pool_recycle": 300,
-                "pool_size": 5,
-                "max_overflow": 10
+                "pool_size": 1,
+                "max_overflow": 0,
+                "connect_args": KEEPALIVE_CONNECT_ARGS
             }
             print("Configuring PostgreSQL connection settings")
         
         # Create engine and tables
         engine = create_engine(DB_URL, **engine_args)
+        tune_for_bulk_load(engine)
         
         # Create the tables if they don't exist
         Base.metadata.create_all(engine, tables=[Order.__table__, OrderItem.__table__])
@@ -64,120 +96,233 @@ def create_order_tables():
             print(f"\nCurrent DATABASE_URL: {DB_URL}")
         sys.exit(1)
 
+# Column order used when streaming rows with COPY
+ORDER_COLUMNS = [
+    'id', 'order_number', 'user_id', 'total_amount', 'status', 'ordered_at',
+    'estimated_delivery', 'delivered_at', 'shipping_address', 'tracking_number'
+]
+ORDER_ITEM_COLUMNS = ['order_id', 'product_name', 'quantity', 'price']
+
+def assign_order_ids(orders, order_items, order_ids):
+    """
+    Give each order its primary key and point its items at it
+    
+    Args:
+        orders (dict): Order column buffers
+        order_items (dict): Order item column buffers, 'order_id' holding order positions
+        order_ids (list): Primary keys to assign, one per order
+    """
+    orders['id'] = list(order_ids)
+    order_items['order_id'] = [orders['id'][position] for position in order_items['order_id']]
+
+def copy_records(columns, column_names):
+    """Zip column buffers into row tuples in column order"""
+    return list(zip(*(columns[name] for name in column_names)))
+
+def copy_rows(cursor, table, column_names, columns):
+    """Stream column buffers into a PostgreSQL table with COPY FROM STDIN"""
+    buffer = io.StringIO()
+    # None becomes an unquoted empty field, i.e. NULL
+    csv.writer(buffer).writerows(copy_records(columns, column_names))
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(column_names)}) FROM STDIN WITH (FORMAT CSV)", buffer)
+
+async def copy_orders_binary(dsn, orders, order_items):
+    """
+    Load orders and their items with asyncpg's binary COPY, in one transaction
+    
+    Args:
+        dsn (str): PostgreSQL connection string
+        orders (dict): Order column buffers
+        order_items (dict): Order item column buffers
+    """
+    conn = await asyncpg.connect(dsn, server_settings=BULK_LOAD_SETTINGS)
+    try:
+        async with conn.transaction():
+            order_ids = await conn.fetch(
+                "SELECT nextval('orders_id_seq') FROM generate_series(1, $1)", len(orders['order_number'])
+            )
+            assign_order_ids(orders, order_items, [row[0] for row in order_ids])
+            await conn.copy_records_to_table(
+                Order.__tablename__, records=copy_records(orders, ORDER_COLUMNS), columns=ORDER_COLUMNS
+            )
+            await conn.copy_records_to_table(
+                OrderItem.__tablename__, records=copy_records(order_items, ORDER_ITEM_COLUMNS), columns=ORDER_ITEM_COLUMNS
+            )
+    finally:
+        await conn.close()
+
+def write_orders(engine, orders, order_items):
+    """
+    Insert generated orders and their items in bulk
+    
+    PostgreSQL reserves the order IDs from the sequence and loads both tables with COPY,
+    binary through asyncpg when it is installed; other databases number the orders after
+    the current maximum ID and use executemany.
+    
+    Args:
+        engine: SQLAlchemy engine
+        orders (dict): Order column buffers
+        order_items (dict): Order item column buffers, 'order_id' holding order positions
+    """
+    num_orders = len(orders['order_number'])
+    if not num_orders:
+        return
+    
+    if engine.dialect.name == 'postgresql' and asyncpg is not None:
+        dsn = engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        asyncio.run(copy_orders_binary(dsn, orders, order_items))
+    elif engine.dialect.name == 'postgresql':
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT nextval('orders_id_seq') FROM generate_series(1, %s)", (num_orders,))
+            assign_order_ids(orders, order_items, [row[0] for row in cursor.fetchall()])
+            copy_rows(cursor, Order.__tablename__, ORDER_COLUMNS, orders)
+            copy_rows(cursor, OrderItem.__tablename__, ORDER_ITEM_COLUMNS, order_items)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+    else:
+        with engine.begin() as conn:
+            first_id = conn.execute(select(func.coalesce(func.max(Order.id), 0))).scalar() + 1
+            assign_order_ids(orders, order_items, range(first_id, first_id + num_orders))
+            conn.execute(insert(Order), [dict(zip(ORDER_COLUMNS, row)) for row in copy_records(orders, ORDER_COLUMNS)])
+            conn.execute(insert(OrderItem), [
+                dict(zip(ORDER_ITEM_COLUMNS, row)) for row in copy_records(order_items, ORDER_ITEM_COLUMNS)
+            ])
+
+def generate_order_numbers(rng, num_orders, taken_numbers=()):
+    """
+    Draw distinct order numbers that are not already taken
+    
+    The number space grows beyond five digits when it is less than twice the number of
+    orders, new and existing, so large batches never run out of free numbers.
+    
+    Args:
+        rng: NumPy random Generator
+        num_orders (int): Number of order numbers to draw
+        taken_numbers (iterable): Order numbers already in use
+    
+    Returns:
+        ndarray: num_orders distinct order numbers
+    """
+    taken = np.fromiter(taken_numbers, dtype=np.int64)
+    space = max(ORDER_NUMBER_SPACE, 2 * (num_orders + taken.size))
+    
+    # Draw enough candidates that some are left after dropping every taken number
+    candidates = rng.choice(space, size=num_orders + taken.size, replace=False) + ORDER_NUMBER_START
+    return candidates[~np.isin(candidates, taken)][:num_orders]
+
+def taken_order_numbers(session):
+    """Get the numeric part of every existing ORD-<number> order number"""
+    numbers = (order_number[4:] for (order_number,) in session.query(Order.order_number))
+    return [int(number) for number in numbers if number.isdigit()]
+
+def generate_orders(user_ids, num_orders, rng=None, taken_numbers=()):
+    """
+    Generate random sample orders, drawing every random value for the batch as NumPy arrays
+    
+    Rows are kept as one list per column rather than a dict per row, ready to be zipped
+    into COPY records.
+    
+    Args:
+        user_ids (list): IDs of the users placing orders
+        num_orders (int): Number of orders to generate
+        rng: NumPy random Generator, a fresh one by default
+        taken_numbers (iterable): Order numbers already in the database, as integers
+    
+    Returns:
+        tuple: (orders, order_items) column buffers mapping column names to value lists;
+        order_items['order_id'] holds each item's order position until IDs are assigned
+    """
+    num_orders = max(num_orders, 0)
+    rng = rng or np.random.default_rng()
+    now = np.datetime64(datetime.now(), 'us')
+    
+    # Per-order values: order date 1-60 days ago, delivery estimate 3-14 days later,
+    # delivery 2-13 days after ordering (but not after the estimate), and 1-5 items
+    order_numbers = generate_order_numbers(rng, num_orders, taken_numbers)
+    status_indices = rng.choice(len(STATUS_CHOICES), size=num_orders, p=STATUS_WEIGHTS)
+    ordered_at = now - rng.integers(1, 61, size=num_orders).astype('timedelta64[D]')
+    estimated_days = rng.integers(3, 15, size=num_orders)
+    delivered_days = rng.integers(2, np.minimum(13, estimated_days) + 1)
+    delivered = status_indices == STATUS_CHOICES.index(OrderStatus.DELIVERED)
+    untracked = [STATUS_CHOICES.index(OrderStatus.PENDING), STATUS_CHOICES.index(OrderStatus.PROCESSING)]
+    tracked = ~np.isin(status_indices, untracked)
+    street_numbers = rng.integers(1, 1000, size=num_orders)
+    zip_codes = rng.integers(10000, 100000, size=num_orders)
+    tracking_numbers = rng.integers(1000000, 10000000, size=num_orders)
+    num_items = rng.integers(1, 6, size=num_orders)
+    
+    # Distinct products per order: the first num_items columns of a random permutation per row,
+    # flattened so each order's products are contiguous
+    permutations = rng.random((num_orders, len(PRODUCTS))).argsort(axis=1)
+    product_indices = permutations[np.arange(len(PRODUCTS)) < num_items[:, None]]
+    
+    # Per-item values: a price within each product's range and quantity 1-3
+    price_ranges = np.array([product["price_range"] for product in PRODUCTS])
+    prices = np.round(rng.uniform(price_ranges[product_indices, 0], price_ranges[product_indices, 1]), 2)
+    quantities = rng.integers(1, 4, size=product_indices.size)
+    line_totals = prices * quantities
+    totals = np.round(np.add.reduceat(line_totals, np.cumsum(num_items) - num_items), 2) if num_orders else line_totals
+    
+    # Enum columns take the stored member names
+    status_names = np.array([status.name for status in STATUS_CHOICES])
+    product_names = np.array([product["name"] for product in PRODUCTS])
+    
+    orders = {
+        'order_number': [f"ORD-{number}" for number in order_numbers.tolist()],
+        'user_id': rng.choice(np.asarray(user_ids), size=num_orders).tolist(),
+        'total_amount': totals.tolist(),
+        'status': status_names[status_indices].tolist(),
+        'ordered_at': ordered_at.tolist(),
+        'estimated_delivery': (ordered_at + estimated_days.astype('timedelta64[D]')).tolist(),
+        'delivered_at': np.where(delivered, ordered_at + delivered_days.astype('timedelta64[D]'), np.datetime64('NaT')).tolist(),
+        'shipping_address': [
+            f"{street} Main St, City, State, {zip_code}"
+            for street, zip_code in zip(street_numbers.tolist(), zip_codes.tolist())
+        ],
+        'tracking_number': [
+            f"TRK-{number}" if has_tracking else None
+            for number, has_tracking in zip(tracking_numbers.tolist(), tracked.tolist())
+        ]
+    }
+    order_items = {
+        'order_id': np.repeat(np.arange(num_orders), num_items).tolist(),
+        'product_name': product_names[product_indices].tolist(),
+        'quantity': quantities.tolist(),
+        'price': prices.tolist()
+    }
+    return orders, order_items
+
 def seed_sample_orders(engine, num_orders=20):
     """Seed the database with sample orders"""
     # Create session
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
     session = Session()
-    orders_created = 0
     
     try:
         # Check if users exist
-        users = session.query(User).all()
-        if not users:
+        user_ids = [user_id for (user_id,) in session.query(User.id)]
+        if not user_ids:
             print("No users found in the database. Please run setup_db.py first to create users.")
             return
             
-        print(f"Found {len(users)} users in the database.")
+        print(f"Found {len(user_ids)} users in the database.")
         print(f"Attempting to create {num_orders} sample orders...")
         
-        # Sample products with price ranges
-        products = [
-            {"name": "Smartphone X", "price_range": (499.99, 1299.99)},
-            {"name": "Laptop Pro", "price_range": (899.99, 2499.99)},
-            {"name": "Wireless Headphones", "price_range": (79.99, 349.99)},
-            {"name": "Smart Watch", "price_range": (199.99, 499.99)},
-            {"name": "Tablet Ultra", "price_range": (329.99, 999.99)},
-            {"name": "Gaming Console", "price_range": (299.99, 599.99)},
-            {"name": "Digital Camera", "price_range": (249.99, 1499.99)},
-            {"name": "Bluetooth Speaker", "price_range": (59.99, 299.99)},
-            {"name": "Fitness Tracker", "price_range": (49.99, 149.99)},
-            {"name": "4K Monitor", "price_range": (199.99, 799.99)}
-        ]
+        # New order numbers must not collide with those of earlier runs
+        taken_numbers = taken_order_numbers(session)
         
-        # Generate orders
-        for i in range(1, num_orders + 1):
-            # Generate a random order number
-            order_number = f"ORD-{random.randint(10000, 99999)}"
-            
-            # Select a random user
-            user = random.choice(users)
-            
-            # Determine order date (between 1-60 days ago)
-            days_ago = random.randint(1, 60)
-            order_date = datetime.now() - timedelta(days=days_ago)
-            
-            # Determine number of items in the order (1-5)
-            num_items = random.randint(1, 5)
-            
-            # Select products for the order
-            order_products = random.sample(products, num_items)
-            
-            # Calculate total amount
-            total_amount = 0
-            
-            # Choose a random status biased towards being complete
-            status_choices = [
-                OrderStatus.PENDING,
-                OrderStatus.PROCESSING,
-                OrderStatus.SHIPPED,
-                OrderStatus.DELIVERED,
-                OrderStatus.CANCELLED,
-                OrderStatus.BACKORDERED
-            ]
-            status_weights = [0.1, 0.2, 0.2, 0.3, 0.1, 0.1]  # More likely to be delivered
-            order_status = random.choices(status_choices, weights=status_weights)[0]
-            
-            # Calculate estimated and actual delivery dates
-            estimated_delivery = order_date + timedelta(days=random.randint(3, 14))
-            delivered_at = None
-            if order_status == OrderStatus.DELIVERED:
-                # Delivered between order date and estimated delivery
-                delivered_at = order_date + timedelta(days=random.randint(2, min(13, (estimated_delivery - order_date).days)))
-            
-            # Create the order
-            order = Order(
-                order_number=order_number,
-                user_id=user.id,
-                total_amount=0,  # Will update after adding items
-                status=order_status,
-                ordered_at=order_date,
-                estimated_delivery=estimated_delivery,
-                delivered_at=delivered_at,
-                shipping_address=f"{random.randint(1, 999)} Main St, City, State, {random.randint(10000, 99999)}",
-                tracking_number=f"TRK-{random.randint(1000000, 9999999)}" if order_status not in [OrderStatus.PENDING, OrderStatus.PROCESSING] else None
-            )
-            
-            session.add(order)
-            session.flush()  # Flush to get the order ID
-            
-            # Add order items
-            for product in order_products:
-                # Random price within the product's range
-                min_price, max_price = product["price_range"]
-                price = round(random.uniform(min_price, max_price), 2)
-                
-                # Random quantity (1-3)
-                quantity = random.randint(1, 3)
-                
-                # Create order item
-                order_item = OrderItem(
-                    order_id=order.id,
-                    product_name=product["name"],
-                    quantity=quantity,
-                    price=price
-                )
-                
-                session.add(order_item)
-                
-                # Add to total
-                total_amount += price * quantity
-            
-            # Update order total
-            order.total_amount = round(total_amount, 2)
+        # Release the read transaction before writing
+        session.close()
         
-        # Commit changes
-        session.commit()
+        # Generate the orders and insert everything in bulk
+        write_orders(engine, *generate_orders(user_ids, num_orders, taken_numbers=taken_numbers))
         
         print(f"Successfully created {num_orders} sample orders.")
         
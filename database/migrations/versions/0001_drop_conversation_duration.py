@@ -0,0 +1,51 @@
+"""Drop the stored conversations.duration column
+
+Conversation.duration is computed from start_time and end_time when it is read,
+so the stored column is no longer written. Databases created before that change
+still have it; databases created since never had it.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from database.models import seconds_between
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_duration_column():
+    columns = sa.inspect(op.get_bind()).get_columns('conversations')
+    return any(column['name'] == 'duration' for column in columns)
+
+
+def upgrade():
+    if _has_duration_column():
+        # batch mode rebuilds the table on SQLite, which can't always drop columns in place
+        with op.batch_alter_table('conversations') as batch_op:
+            batch_op.drop_column('duration')
+
+
+def downgrade():
+    if not _has_duration_column():
+        with op.batch_alter_table('conversations') as batch_op:
+            batch_op.add_column(sa.Column('duration', sa.Float(), nullable=True))
+    
+    # Backfill the stored value from the timestamps it is now computed from
+    conversations = sa.table(
+        'conversations',
+        sa.column('start_time', sa.DateTime),
+        sa.column('end_time', sa.DateTime),
+        sa.column('duration', sa.Float)
+    )
+    op.execute(conversations.update().values(
+        duration=seconds_between(conversations.c.start_time, conversations.c.end_time)
+    ))
@@ -1,12 +1,30 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Float, create_engine, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Float, create_engine, Enum, DDL, event
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
+from sqlalchemy.sql.functions import FunctionElement
 from datetime import datetime
 import os
 import enum
 
 Base = declarative_base()
 
+class seconds_between(FunctionElement):
+    """SQL expression for the number of seconds from one timestamp to another"""
+    type = Float()
+    name = 'seconds_between'
+    inherit_cache = True
+
+@compiles(seconds_between)
+def _seconds_between_sqlite(element, compiler, **kw):
+    start, end = [compiler.process(clause, **kw) for clause in element.clauses]
+    return f"((julianday({end}) - julianday({start})) * 86400)"
+
+@compiles(seconds_between, 'postgresql')
+def _seconds_between_postgresql(element, compiler, **kw):
+    start, end = [compiler.process(clause, **kw) for clause in element.clauses]
+    return f"EXTRACT(EPOCH FROM ({end} - {start}))"
+
 class User(Base):
     __tablename__ = 'users'
     
@@ -30,9 +48,9 @@ class Conversation(Base):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
-    start_time = Column(DateTime, default=datetime.now)
+    start_time = Column(DateTime, default=datetime.now)  # local time, like every other timestamp column
     end_time = Column(DateTime, nullable=True)
-    duration = Column(Float, nullable=True)  # in seconds
+    duration = column_property(seconds_between(start_time, end_time))  # in seconds, computed by the database
     
     # Relationships
     user = relationship("User", back_populates="conversations")
@@ -89,6 +107,17 @@ class SupportData(Base):
     def __repr__(self):
         return f"<SupportData(id={self.id}, company_id={self.company_id})>"
 
+# Unique (company_id, question) index that lets imports skip duplicates with ON CONFLICT DO NOTHING.
+# PostgreSQL indexes an md5 of the question so long questions stay within the btree row size limit.
+SUPPORT_DATA_QUESTION_INDEX = {
+    'postgresql': "CREATE UNIQUE INDEX IF NOT EXISTS ux_support_data_company_question "
+                  "ON support_data (company_id, md5(question))",
+    'sqlite': "CREATE UNIQUE INDEX IF NOT EXISTS ux_support_data_company_question "
+              "ON support_data (company_id, question)"
+}
+for _dialect, _statement in SUPPORT_DATA_QUESTION_INDEX.items():
+    event.listen(SupportData.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+
 class OrderStatus(enum.Enum):
     PENDING = "pending"
     PROCESSING = "processing"
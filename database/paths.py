@@ -0,0 +1,24 @@
+"""
+Project paths and the database URL shared by the database scripts, resolved once at import
+"""
+
+import os
+from pathlib import Path
+
+from utils.env import load_env
+
+# Load environment variables
+load_env()
+
+# Absolute project root
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Development SQLite database, used when DATABASE_URL is not set
+SQLITE_DB_PATH = PROJECT_ROOT / "database" / "chatbot.db"
+SQLITE_DB_URL = f"sqlite:///{SQLITE_DB_PATH}"
+
+# DATABASE_URL from the environment or .env, if set
+ENV_DB_URL = os.getenv("DATABASE_URL")
+
+# Database URL to use, defaulting to the SQLite database
+DB_URL = ENV_DB_URL or SQLITE_DB_URL
@@ -1,39 +1,63 @@
 import os
 import sys
 import sqlite3
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
 import argparse
 
 # Add parent directory to path to import models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.paths import DB_URL, ENV_DB_URL
 from database.models import Base, User, Conversation, Message, Company, SupportData
-
-# Load environment variables
-load_dotenv()
-
-# Get the absolute project root path
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from database.bulk_load import KEEPALIVE_CONNECT_ARGS, tune_for_bulk_load
 
 # Database URL (default to SQLite for development)
-# Use absolute path for the SQLite database file
-DB_URL = os.getenv("DATABASE_URL")
-if not DB_URL:
-    DB_PATH = os.path.join(PROJECT_ROOT, "database", "chatbot.db")
-    DB_URL = f"sqlite:///{DB_PATH}"
+if not ENV_DB_URL:
     os.environ["DATABASE_URL"] = DB_URL
     print(f"No DATABASE_URL found in .env, defaulting to SQLite: {DB_URL}")
 else:
     print(f"Using database URL from .env: {DB_URL}")
 
+# Engine shared by every setup_database call in this process
+_engine = None
+
+def get_engine():
+    """
+    Get the database engine, creating it on first use
+    
+    Setup uses one session at a time, so PostgreSQL gets a single pooled
+    connection without pre-ping round trips.
+    
+    Returns:
+        Engine: SQLAlchemy engine for DB_URL
+    """
+    global _engine
+    if _engine is None:
+        engine_args = {}
+        if "postgresql" in DB_URL:
+            engine_args = {
+                "pool_recycle": 300,
+                "pool_size": 1,
+                "max_overflow": 0,
+                "connect_args": KEEPALIVE_CONNECT_ARGS
+            }
+            if make_url(DB_URL).get_driver_name() == "psycopg2":
+                # Send executemany INSERTs as multi-row VALUES pages
+                engine_args["executemany_mode"] = "values_plus_batch"
+                engine_args["executemany_values_page_size"] = 10000
+            print("Configuring PostgreSQL connection settings")
+        _engine = create_engine(DB_URL, **engine_args)
+        tune_for_bulk_load(_engine)
+    return _engine
+
 def check_existing_data(session):
     """Check and print counts of existing data in the database"""
-    user_count = session.query(User).count()
-    company_count = session.query(Company).count()
-    support_data_count = session.query(SupportData).count()
-    conversation_count = session.query(Conversation).count()
-    message_count = session.query(Message).count()
+    # Count every table in one round trip
+    user_count, company_count, support_data_count, conversation_count, message_count = session.execute(select(
+        *(select(func.count()).select_from(model).scalar_subquery()
+          for model in (User, Company, SupportData, Conversation, Message))
+    )).one()
     
     print("\nExisting data in database:")
     print(f"- Users: {user_count}")
@@ -53,26 +77,15 @@ def setup_database(force_add_sample_data=False):
         if DB_URL.startswith("sqlite:///"):
             db_path = DB_URL.replace("sqlite:///", "")
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-        # Configure PostgreSQL settings if using PostgreSQL
-        engine_args = {}
-        if "postgresql" in DB_URL:
-            engine_args = {
-                "pool_pre_ping": True,
-                "pool_recycle": 300,
-                "pool_size": 5,
-                "max_overflow": 10
-            }
-            print("Configuring PostgreSQL connection settings")
         
-        # Create database engine
-        engine = create_engine(DB_URL, **engine_args)
+        # Get the shared database engine
+        engine = get_engine()
         
         # Create all tables
         Base.metadata.create_all(engine)
         
         # Create session
-        Session = sessionmaker(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
         session = Session()
         
         # Check if tables are created
@@ -123,29 +136,30 @@ def add_sample_data(session):
         website="https://example.com"
     )
     session.add(company)
+    session.flush()
     
-    # Add sample support data
+    # Add sample support data as a single executemany INSERT
     support_data = [
-        SupportData(
-            company=company,
-            question="How do I reset my password?",
-            answer="You can reset your password by clicking on the 'Forgot Password' link on the login page.",
-            category="Account"
-        ),
-        SupportData(
-            company=company,
-            question="What payment methods do you accept?",
-            answer="We accept Visa, Mastercard, American Express, and PayPal.",
-            category="Payments"
-        ),
-        SupportData(
-            company=company,
-            question="How do I contact customer support?",
-            answer="You can contact our customer support team at support@example.com or call us at 555-123-4567.",
-            category="Support"
-        )
+        {
+            "company_id": company.id,
+            "question": "How do I reset my password?",
+            "answer": "You can reset your password by clicking on the 'Forgot Password' link on the login page.",
+            "category": "Account"
+        },
+        {
+            "company_id": company.id,
+            "question": "What payment methods do you accept?",
+            "answer": "We accept Visa, Mastercard, American Express, and PayPal.",
+            "category": "Payments"
+        },
+        {
+            "company_id": company.id,
+            "question": "How do I contact customer support?",
+            "answer": "You can contact our customer support team at support@example.com or call us at 555-123-4567.",
+            "category": "Support"
+        }
     ]
-    session.add_all(support_data)
+    session.execute(insert(SupportData), support_data)
     
     # Commit changes
     session.commit()
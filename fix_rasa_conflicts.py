@@ -4,10 +4,17 @@
 import os
 import sys
 import re
+import ast
 import yaml
 import logging
-import glob
+import collections
+import functools
+import itertools
+import mmap
+import pickle
 import shutil
+import string
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Any, Optional
@@ -16,7 +23,7 @@ from typing import Dict, List, Set, Tuple, Any, Optional
 from check_rasa_conflicts import (
     ConflictChecker, 
     RASA_DIR, DATA_DIR, DOMAIN_PATH, NLU_PATH, 
-    STORIES_PATH, RULES_PATH, ACTIONS_PATH, CONFIG_PATH
+    STORIES_PATH, RULES_PATH, ACTIONS_PATH, CONFIG_PATH, CLASS_RE, action_class_name
 )
 
 # Configure logging
@@ -43,6 +50,56 @@ CONFIG_PATH = os.path.join(RASA_DIR, "config.yml")
 # Directory for backups
 BACKUP_DIR = os.path.join(RASA_DIR, "rasa_backups")
 
+# Number of backups kept for each file; older ones are deleted
+MAX_BACKUPS_PER_FILE = 5
+
+# Symbols used by the NLU data, collected in one pass
+NluIndex = collections.namedtuple('NluIndex', ['intents', 'entities', 'has_regex'])
+
+# Actions and slots used by stories and rules, collected in one pass
+StoryIndex = collections.namedtuple('StoryIndex', ['actions', 'slots', 'utter_actions'])
+
+# Entity annotations in NLU examples: [text](entity), within a single line
+ENTITY_RE = re.compile(r'\[[^\]\n]*\]\((\w+)\)')
+
+# Header of a newly created actions.py
+ACTIONS_FILE_HEADER = """# This file contains the custom actions which can be used to run
+# custom Python code.
+#
+# See this guide on how to implement these action:
+# https://rasa.com/docs/rasa/custom-actions
+
+from typing import Any, Text, Dict, List
+
+from rasa_sdk import Action, Tracker
+from rasa_sdk.executor import CollectingDispatcher
+
+"""
+
+# Implementation stub generated for a custom action missing from actions.py
+ACTION_TEMPLATE = string.Template("""
+class $class_name(Action):
+    def name(self) -> Text:
+        return "$action"
+    
+    def run(self, dispatcher: CollectingDispatcher,
+            tracker: Tracker,
+            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        # TODO: Implement action logic here
+        dispatcher.utter_message(text="Action $action executed")
+        return []
+""")
+
+# Pickled YAML parses, reused while the source file's mtime and size are unchanged
+CACHE_DIR = os.path.join(BACKUP_DIR, ".cache")
+
+# Pickled YAML parses kept for repeat runs in one process: absolute path -> (mtime_ns, size, pickled data)
+_parse_cache: Dict[str, Tuple[int, int, bytes]] = {}
+
+# Use the libyaml C parser and emitter when PyYAML was built with them
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 class ConflictFixer:
     """
@@ -51,20 +108,63 @@ class ConflictFixer:
     """
     
     def __init__(self):
-        self.domain_data = {}
-        self.nlu_data = {}
-        self.stories_data = {}
-        self.rules_data = {}
-        self.config_data = {}
         self.fixes_count = 0
+        self.nlu_index = None
+        self.story_index = None
+        
+        # YAML files modified in memory and not yet written
+        self._dirty = set()
         
         # Create backup directory if it doesn't exist
         if not os.path.exists(BACKUP_DIR):
             os.makedirs(BACKUP_DIR)
             logger.info(f"Created backup directory: {BACKUP_DIR}")
+        else:
+            self._prune_backups()
+    
+    def _prune_backups(self, max_per_file: int = MAX_BACKUPS_PER_FILE) -> int:
+        """
+        Delete all but the newest backups of each file in the backup directory.
         
-        # Load all YAML files
-        self._load_all_files()
+        Args:
+            max_per_file: Number of backups to keep for each original file
+            
+        Returns:
+            Number of backups deleted
+        """
+        # Group backups by original file name, reading each mtime from the directory scan
+        backups = collections.defaultdict(list)
+        with os.scandir(BACKUP_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and ".backup." in entry.name:
+                    original_name = entry.name.split(".backup.", 1)[0]
+                    backups[original_name].append((entry.stat().st_mtime_ns, entry.path))
+        
+        pruned = 0
+        for file_backups in backups.values():
+            file_backups.sort(reverse=True)
+            for _, path in file_backups[max_per_file:]:
+                try:
+                    os.unlink(path)
+                    pruned += 1
+                except OSError as e:
+                    logger.warning(f"Could not delete old backup {path}: {str(e)}")
+        
+        if pruned:
+            logger.info(f"Deleted {pruned} old backups from {BACKUP_DIR}")
+        return pruned
+    
+    def _cache_path(self, file_path: str) -> str:
+        """
+        Get the path of the parse cache entry for a YAML file.
+        
+        Args:
+            file_path: Path to the YAML file
+            
+        Returns:
+            Path to the pickled parse of the file
+        """
+        return os.path.join(CACHE_DIR, os.path.basename(file_path) + ".pkl")
     
     def _load_yaml(self, file_path: str) -> Dict:
         """
@@ -81,8 +181,41 @@ class ConflictFixer:
                 logger.warning(f"File {file_path} does not exist")
                 return {}
                 
+            stat = os.stat(file_path)
+            cache_key = os.path.abspath(file_path)
+            
+            # Reuse this process's parse if the file has not changed since; unpickling gives each caller its own copy
+            cached = _parse_cache.get(cache_key)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return pickle.loads(cached[2])
+            
+            # Reuse the cached parse if the file has not changed since it was written
+            cache_path = self._cache_path(file_path)
+            try:
+                with open(cache_path, 'rb') as cache:
+                    mtime_ns, size, pickled = pickle.load(cache)
+                if mtime_ns == stat.st_mtime_ns and size == stat.st_size and isinstance(pickled, bytes):
+                    _parse_cache[cache_key] = (mtime_ns, size, pickled)
+                    return pickle.loads(pickled)
+            except Exception:
+                pass
+                
             with open(file_path, 'r', encoding='utf-8') as file:
-                return yaml.safe_load(file) or {}
+                data = yaml.load(file, Loader=YamlLoader) or {}
+            pickled = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+            _parse_cache[cache_key] = (stat.st_mtime_ns, stat.st_size, pickled)
+            
+            # Write the cache entry atomically so a concurrent run never reads a partial pickle
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as cache:
+                    pickle.dump((stat.st_mtime_ns, stat.st_size, pickled), cache, pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f"Could not cache {file_path}: {str(e)}")
+            
+            return data
         except Exception as e:
             logger.error(f"Error loading {file_path}: {str(e)}")
             return {}
@@ -90,7 +223,8 @@ class ConflictFixer:
     def _save_yaml(self, data: Dict, file_path: str) -> bool:
         """
         Save dictionary as YAML to the specified file path.
-        Creates a backup of the original file first.
+        Skips the write if the file already holds the same YAML, and otherwise
+        backs up the original file first.
         
         Args:
             data: Dictionary to save
@@ -100,16 +234,46 @@ class ConflictFixer:
             True if successful, False otherwise
         """
         try:
-            # Create backup if file exists
+            # Keep the file's key order and never wrap long scalars
+            content = yaml.dump(
+                data, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True,
+                sort_keys=False, width=10**9, encoding='utf-8'
+            )
+            
             if os.path.exists(file_path):
+                # Leave the file alone if it already holds this exact YAML
+                if os.path.getsize(file_path) == len(content):
+                    with open(file_path, 'rb') as file:
+                        if file.read() == content:
+                            logger.info(f"No changes to {file_path}")
+                            return True
+                
+                # Back up the original with a hard link, which works because the file is replaced rather than rewritten
                 backup_filename = os.path.basename(file_path) + f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 backup_path = os.path.join(BACKUP_DIR, backup_filename)
-                shutil.copy2(file_path, backup_path)
+                try:
+                    os.link(file_path, backup_path)
+                except OSError:
+                    shutil.copy2(file_path, backup_path)
                 logger.info(f"Created backup: {backup_path}")
                 
-            # Save updated file
-            with open(file_path, 'w', encoding='utf-8') as file:
-                yaml.dump(data, file, default_flow_style=False, allow_unicode=True)
+            # Write to a temporary file and swap it in atomically
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(content)
+            if os.path.exists(file_path):
+                shutil.copymode(file_path, tmp_path)
+            os.replace(tmp_path, file_path)
+            
+            # Drop the stale parse cache entry and remember what was written for this process
+            try:
+                os.remove(self._cache_path(file_path))
+            except FileNotFoundError:
+                pass
+            stat = os.stat(file_path)
+            _parse_cache[os.path.abspath(file_path)] = (
+                stat.st_mtime_ns, stat.st_size, pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+            )
                 
             logger.info(f"Updated file: {file_path}")
             return True
@@ -117,13 +281,108 @@ class ConflictFixer:
             logger.error(f"Error saving {file_path}: {str(e)}")
             return False
     
-    def _load_all_files(self) -> None:
-        """Load all required Rasa configuration files."""
-        self.domain_data = self._load_yaml(DOMAIN_PATH)
-        self.nlu_data = self._load_yaml(NLU_PATH)
-        self.stories_data = self._load_yaml(STORIES_PATH)
-        self.rules_data = self._load_yaml(RULES_PATH)
-        self.config_data = self._load_yaml(CONFIG_PATH)
+    # Each Rasa file is loaded the first time a fix reads it
+    @functools.cached_property
+    def domain_data(self) -> Dict:
+        return self._load_yaml(DOMAIN_PATH)
+    
+    @functools.cached_property
+    def nlu_data(self) -> Dict:
+        return self._load_yaml(NLU_PATH)
+    
+    @functools.cached_property
+    def stories_data(self) -> Dict:
+        return self._load_yaml(STORIES_PATH)
+    
+    @functools.cached_property
+    def rules_data(self) -> Dict:
+        return self._load_yaml(RULES_PATH)
+    
+    @functools.cached_property
+    def config_data(self) -> Dict:
+        return self._load_yaml(CONFIG_PATH)
+    
+    def _defined_classes(self, source) -> Set[str]:
+        """
+        Get the names of the classes defined in Python source code.
+        
+        Args:
+            source: Contents of actions.py as str or a bytes-like object such as an mmap
+            
+        Returns:
+            Set of class names, found with a regex scan if the source does not parse
+        """
+        try:
+            tree = ast.parse(source, filename=ACTIONS_PATH)
+        except SyntaxError as e:
+            logger.warning(f"Could not parse {ACTIONS_PATH}: {str(e)}")
+            if not isinstance(source, str):
+                source = bytes(source).decode('utf-8', errors='replace')
+            return set(CLASS_RE.findall(source))
+        
+        return {node.name for node in ast.walk(tree) if isinstance(node, ast.ClassDef)}
+    
+    def _index_nlu(self) -> NluIndex:
+        """
+        Collect the intents, entities and regex usage of the NLU data in a single pass.
+        Intents and entities are dicts used as ordered sets, in order of first use.
+        
+        Returns:
+            NluIndex of NLU intents, entity names and whether regex features are defined
+        """
+        intents = {}
+        examples = []
+        has_regex = False
+        
+        for item in self.nlu_data.get('nlu', []):
+            if item.get('intent'):
+                intents[item.get('intent')] = None
+            if 'examples' in item:
+                examples.append(item['examples'])
+            if 'regex' in item:
+                has_regex = True
+        
+        # Scan every example block in one regex call
+        entities = dict.fromkeys(ENTITY_RE.findall("\n".join(examples)))
+        
+        return NluIndex(intents, entities, has_regex)
+    
+    def _iter_steps(self):
+        """
+        Iterate over the steps of every story and rule.
+        
+        Yields:
+            Each step dict, stories first and then rules
+        """
+        for item in itertools.chain(self.stories_data.get('stories', []), self.rules_data.get('rules', [])):
+            yield from item.get('steps', [])
+    
+    def _index_stories_rules(self) -> StoryIndex:
+        """
+        Collect the actions and slots used by stories and rules in a single pass over their steps.
+        Each collection is a dict used as an ordered set, in order of first use.
+        
+        Returns:
+            StoryIndex of used actions, slots set by slot_was_set and utter_ actions
+        """
+        actions = {}
+        slots = {}
+        
+        for step in self._iter_steps():
+            # One lookup per key instead of a membership test followed by indexing
+            action = step.get('action')
+            if action:
+                actions[action] = None
+            slot_items = step.get('slot_was_set')
+            if slot_items:
+                for slot_item in slot_items:
+                    if isinstance(slot_item, dict):
+                        slots.update(dict.fromkeys(slot_item))
+                    else:
+                        slots[slot_item] = None
+        
+        utter_actions = {action: None for action in actions if action.startswith('utter_')}
+        return StoryIndex(actions, slots, utter_actions)
     
     def fix_missing_intents(self) -> int:
         """
@@ -135,15 +394,12 @@ class ConflictFixer:
         fixes_count = 0
         
         # Extract intents from domain and NLU
-        domain_intents = set(self.domain_data.get('intents', []))
+        domain_intents = dict.fromkeys(self.domain_data.get('intents') or [])
         
-        nlu_intents = set()
-        for example in self.nlu_data.get('nlu', []):
-            if example.get('intent'):
-                nlu_intents.add(example.get('intent'))
+        nlu_intents = (self.nlu_index or self._index_nlu()).intents
         
         # Add intents from NLU to domain
-        missing_in_domain = nlu_intents - domain_intents
+        missing_in_domain = [intent for intent in nlu_intents if intent not in domain_intents]
         if missing_in_domain:
             fixes_count += len(missing_in_domain)
             
@@ -152,14 +408,14 @@ class ConflictFixer:
                 self.domain_data['intents'] = []
             
             # Add missing intents to domain
-            self.domain_data['intents'].extend(list(missing_in_domain))
+            self.domain_data['intents'].extend(missing_in_domain)
             logger.info(f"Added {len(missing_in_domain)} missing intents to domain: {', '.join(missing_in_domain)}")
             
-            # Save updated domain
-            self._save_yaml(self.domain_data, DOMAIN_PATH)
+            # Mark domain for saving
+            self._dirty.add(DOMAIN_PATH)
         
         # Add intents from domain to NLU with placeholder examples
-        missing_in_nlu = domain_intents - nlu_intents
+        missing_in_nlu = [intent for intent in domain_intents if intent not in nlu_intents]
         if missing_in_nlu:
             fixes_count += len(missing_in_nlu)
             
@@ -176,8 +432,8 @@ class ConflictFixer:
             
             logger.info(f"Added {len(missing_in_nlu)} missing intents to NLU with placeholder examples: {', '.join(missing_in_nlu)}")
             
-            # Save updated NLU
-            self._save_yaml(self.nlu_data, NLU_PATH)
+            # Mark NLU for saving
+            self._dirty.add(NLU_PATH)
         
         return fixes_count
     
@@ -192,22 +448,15 @@ class ConflictFixer:
         fixes_count = 0
         
         # Extract actions from domain and stories/rules
-        domain_actions = set(self.domain_data.get('actions', []))
+        domain_actions = dict.fromkeys(self.domain_data.get('actions') or [])
         
-        story_actions = set()
-        for story in self.stories_data.get('stories', []):
-            for step in story.get('steps', []):
-                if 'action' in step:
-                    story_actions.add(step['action'])
-        
-        for rule in self.rules_data.get('rules', []):
-            for step in rule.get('steps', []):
-                if 'action' in step:
-                    story_actions.add(step['action'])
+        story_actions = (self.story_index or self._index_stories_rules()).actions
         
         # Add actions from stories/rules to domain
-        missing_in_domain = story_actions - domain_actions
-        missing_in_domain = {action for action in missing_in_domain if not action.startswith('utter_')}
+        missing_in_domain = [
+            action for action in story_actions
+            if action not in domain_actions and not action.startswith('utter_')
+        ]
         
         if missing_in_domain:
             fixes_count += len(missing_in_domain)
@@ -217,84 +466,49 @@ class ConflictFixer:
                 self.domain_data['actions'] = []
             
             # Add missing actions to domain
-            self.domain_data['actions'].extend(list(missing_in_domain))
+            self.domain_data['actions'].extend(missing_in_domain)
             logger.info(f"Added {len(missing_in_domain)} missing actions to domain: {', '.join(missing_in_domain)}")
             
-            # Save updated domain
-            self._save_yaml(self.domain_data, DOMAIN_PATH)
+            # Mark domain for saving
+            self._dirty.add(DOMAIN_PATH)
         
         # Create templates for custom actions without implementation
-        custom_actions = {action for action in domain_actions if action.startswith('action_') and not action == 'action_restart'}
-        missing_implementations = set()
+        custom_actions = [action for action in domain_actions if action.startswith('action_') and not action == 'action_restart']
+        missing_implementations = []
         
         if os.path.exists(ACTIONS_PATH):
-            with open(ACTIONS_PATH, 'r', encoding='utf-8') as f:
-                actions_content = f.read()
+            with open(ACTIONS_PATH, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    # Parse straight from the mapped file, closed again before any append
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                        defined_classes = self._defined_classes(source)
+                else:
+                    defined_classes = set()
             
-            for action in custom_actions:
-                class_name = 'class ' + ''.join(word.capitalize() for word in action.split('_')) + '('
-                if class_name not in actions_content:
-                    missing_implementations.add(action)
+            missing_implementations = [action for action in custom_actions if action_class_name(action) not in defined_classes]
         
         if missing_implementations:
             fixes_count += len(missing_implementations)
+            actions_exists = os.path.exists(ACTIONS_PATH)
             
-            # Create backup of actions.py
-            backup_filename = os.path.basename(ACTIONS_PATH) + f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            backup_path = os.path.join(BACKUP_DIR, backup_filename)
-            
-            if os.path.exists(ACTIONS_PATH):
+            if actions_exists:
+                # Create backup of actions.py
+                backup_filename = os.path.basename(ACTIONS_PATH) + f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                backup_path = os.path.join(BACKUP_DIR, backup_filename)
                 shutil.copy2(ACTIONS_PATH, backup_path)
                 logger.info(f"Created backup: {backup_path}")
                 
-                # Append action implementations
-                with open(ACTIONS_PATH, 'a', encoding='utf-8') as f:
-                    f.write("\n\n# Auto-generated action implementations\n")
-                    
-                    for action in missing_implementations:
-                        class_name = ''.join(word.capitalize() for word in action.split('_'))
-                        f.write(f"""
-class {class_name}(Action):
-    def name(self) -> Text:
-        return "{action}"
-    
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        # TODO: Implement action logic here
-        dispatcher.utter_message(text="Action {action} executed")
-        return []
-""")
+                chunks = ["\n\n# Auto-generated action implementations\n"]
             else:
-                # Create new actions.py file
-                with open(ACTIONS_PATH, 'w', encoding='utf-8') as f:
-                    f.write("""# This file contains the custom actions which can be used to run
-# custom Python code.
-#
-# See this guide on how to implement these action:
-# https://rasa.com/docs/rasa/custom-actions
-
-from typing import Any, Text, Dict, List
-
-from rasa_sdk import Action, Tracker
-from rasa_sdk.executor import CollectingDispatcher
-
-""")
-                    
-                    for action in missing_implementations:
-                        class_name = ''.join(word.capitalize() for word in action.split('_'))
-                        f.write(f"""
-class {class_name}(Action):
-    def name(self) -> Text:
-        return "{action}"
-    
-    def run(self, dispatcher: CollectingDispatcher,
-            tracker: Tracker,
-            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
-        # TODO: Implement action logic here
-        dispatcher.utter_message(text="Action {action} executed")
-        return []
-""")
+                # Start a new actions.py file
+                chunks = [ACTIONS_FILE_HEADER]
+            
+            # Build every action implementation and write them in one call
+            for action in missing_implementations:
+                chunks.append(ACTION_TEMPLATE.substitute(class_name=action_class_name(action), action=action))
+            
+            with open(ACTIONS_PATH, 'a' if actions_exists else 'w', encoding='utf-8') as f:
+                f.write("".join(chunks))
             
             logger.info(f"Added {len(missing_implementations)} missing action implementations to {ACTIONS_PATH}")
         
@@ -310,17 +524,12 @@ class {class_name}(Action):
         fixes_count = 0
         
         # Extract entities from domain and NLU
-        domain_entities = set(self.domain_data.get('entities', []))
+        domain_entities = dict.fromkeys(self.domain_data.get('entities') or [])
         
-        nlu_entities = set()
-        for example in self.nlu_data.get('nlu', []):
-            if 'examples' in example:
-                entity_pattern = r'\[.*?\]\((\w+)\)'
-                for match in re.finditer(entity_pattern, example['examples']):
-                    nlu_entities.add(match.group(1))
+        nlu_entities = (self.nlu_index or self._index_nlu()).entities
         
         # Add entities from NLU to domain
-        missing_in_domain = nlu_entities - domain_entities
+        missing_in_domain = [entity for entity in nlu_entities if entity not in domain_entities]
         if missing_in_domain:
             fixes_count += len(missing_in_domain)
             
@@ -329,11 +538,11 @@ class {class_name}(Action):
                 self.domain_data['entities'] = []
             
             # Add missing entities to domain
-            self.domain_data['entities'].extend(list(missing_in_domain))
+            self.domain_data['entities'].extend(missing_in_domain)
             logger.info(f"Added {len(missing_in_domain)} missing entities to domain: {', '.join(missing_in_domain)}")
             
-            # Save updated domain
-            self._save_yaml(self.domain_data, DOMAIN_PATH)
+            # Mark domain for saving
+            self._dirty.add(DOMAIN_PATH)
         
         return fixes_count
     
@@ -347,32 +556,12 @@ class {class_name}(Action):
         fixes_count = 0
         
         # Extract slots from domain and stories/rules
-        domain_slots = set(self.domain_data.get('slots', {}).keys())
-        
-        story_slots = set()
-        
-        # Check stories
-        for story in self.stories_data.get('stories', []):
-            for step in story.get('steps', []):
-                if 'slot_was_set' in step:
-                    for slot_item in step['slot_was_set']:
-                        if isinstance(slot_item, dict):
-                            story_slots.update(slot_item.keys())
-                        else:
-                            story_slots.add(slot_item)
-        
-        # Check rules
-        for rule in self.rules_data.get('rules', []):
-            for step in rule.get('steps', []):
-                if 'slot_was_set' in step:
-                    for slot_item in step['slot_was_set']:
-                        if isinstance(slot_item, dict):
-                            story_slots.update(slot_item.keys())
-                        else:
-                            story_slots.add(slot_item)
+        domain_slots = self.domain_data.get('slots') or {}
+        
+        story_slots = (self.story_index or self._index_stories_rules()).slots
         
         # Add slots from stories/rules to domain
-        missing_in_domain = story_slots - domain_slots
+        missing_in_domain = [slot for slot in story_slots if slot not in domain_slots]
         if missing_in_domain:
             fixes_count += len(missing_in_domain)
             
@@ -389,8 +578,8 @@ class {class_name}(Action):
             
             logger.info(f"Added {len(missing_in_domain)} missing slots to domain: {', '.join(missing_in_domain)}")
             
-            # Save updated domain
-            self._save_yaml(self.domain_data, DOMAIN_PATH)
+            # Mark domain for saving
+            self._dirty.add(DOMAIN_PATH)
         
         return fixes_count
     
@@ -404,26 +593,17 @@ class {class_name}(Action):
         fixes_count = 0
         
         # Check if regex features are defined in NLU
-        has_regex = False
-        for item in self.nlu_data.get('nlu', []):
-            if 'regex' in item:
-                has_regex = True
-                break
-        
-        if has_regex:
+        if (self.nlu_index or self._index_nlu()).has_regex:
             # Check if RegexEntityExtractor is in pipeline
             pipeline = self.config_data.get('pipeline', [])
-            has_regex_extractor = False
+            names = [
+                component if isinstance(component, str)
+                else (component.get('name') or '') if isinstance(component, dict)
+                else ''
+                for component in pipeline
+            ]
             
-            for component in pipeline:
-                if isinstance(component, dict) and component.get('name') == 'RegexEntityExtractor':
-                    has_regex_extractor = True
-                    break
-                elif isinstance(component, str) and component == 'RegexEntityExtractor':
-                    has_regex_extractor = True
-                    break
-            
-            if not has_regex_extractor:
+            if 'RegexEntityExtractor' not in names:
                 fixes_count += 1
                 
                 # Add RegexEntityExtractor to pipeline
@@ -431,24 +611,17 @@ class {class_name}(Action):
                     # Initialize pipeline if needed
                     self.config_data['pipeline'] = [{'name': 'RegexEntityExtractor'}]
                 else:
-                    # Find appropriate position to insert
-                    # Add after entity extractors but before featurizers if possible
-                    inserted = False
-                    for i, component in enumerate(pipeline):
-                        component_name = component if isinstance(component, str) else component.get('name', '')
-                        if 'EntityExtractor' in component_name and 'Regex' not in component_name:
-                            pipeline.insert(i + 1, {'name': 'RegexEntityExtractor'})
-                            inserted = True
-                            break
-                    
-                    if not inserted:
-                        # Just append to the end of the pipeline
-                        pipeline.append({'name': 'RegexEntityExtractor'})
+                    # Add after the first other entity extractor if there is one, else at the end
+                    insert_at = next(
+                        (i + 1 for i, name in enumerate(names) if 'EntityExtractor' in name and 'Regex' not in name),
+                        len(pipeline)
+                    )
+                    pipeline.insert(insert_at, {'name': 'RegexEntityExtractor'})
                 
                 logger.info("Added RegexEntityExtractor to the pipeline")
                 
-                # Save updated config
-                self._save_yaml(self.config_data, CONFIG_PATH)
+                # Mark config for saving
+                self._dirty.add(CONFIG_PATH)
         
         return fixes_count
     
@@ -463,26 +636,13 @@ class {class_name}(Action):
         fixes_count = 0
         
         # Extract all utter_ actions from stories/rules and responses
-        utter_actions = set()
-        
-        # From stories
-        for story in self.stories_data.get('stories', []):
-            for step in story.get('steps', []):
-                if 'action' in step and step['action'].startswith('utter_'):
-                    utter_actions.add(step['action'])
-        
-        # From rules
-        for rule in self.rules_data.get('rules', []):
-            for step in rule.get('steps', []):
-                if 'action' in step and step['action'].startswith('utter_'):
-                    utter_actions.add(step['action'])
+        utter_actions = (self.story_index or self._index_stories_rules()).utter_actions
         
         # Existing responses
-        responses = self.domain_data.get('responses', {})
-        existing_responses = set(responses.keys())
+        existing_responses = self.domain_data.get('responses') or {}
         
         # Find missing responses
-        missing_responses = utter_actions - existing_responses
+        missing_responses = [action for action in utter_actions if action not in existing_responses]
         
         if missing_responses:
             fixes_count += len(missing_responses)
@@ -499,11 +659,33 @@ class {class_name}(Action):
             
             logger.info(f"Created {len(missing_responses)} missing utterance templates: {', '.join(missing_responses)}")
             
-            # Save updated domain
-            self._save_yaml(self.domain_data, DOMAIN_PATH)
+            # Mark domain for saving
+            self._dirty.add(DOMAIN_PATH)
         
         return fixes_count
     
+    def save_changes(self) -> int:
+        """
+        Write every YAML file modified by the fixes, backing up each file once.
+        
+        Returns:
+            Number of files written
+        """
+        files = {
+            DOMAIN_PATH: 'domain_data',
+            NLU_PATH: 'nlu_data',
+            CONFIG_PATH: 'config_data'
+        }
+        
+        dirty = [(getattr(self, attribute), file_path) for file_path, attribute in files.items() if file_path in self._dirty]
+        self._dirty.clear()
+        if len(dirty) <= 1:
+            return sum(self._save_yaml(data, file_path) for data, file_path in dirty)
+        
+        # The files are independent, so back them up and write them concurrently
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            return sum(pool.map(lambda item: self._save_yaml(*item), dirty))
+    
     def run_all_fixes(self) -> int:
         """
         Run all conflict fixes and return the total number of fixes made.
@@ -515,6 +697,10 @@ class {class_name}(Action):
         
         self.fixes_count = 0
         
+        # Index the NLU, stories and rules once for all fixes
+        self.nlu_index = self._index_nlu()
+        self.story_index = self._index_stories_rules()
+        
         # Run all fixes
         self.fixes_count += self.fix_missing_intents()
         self.fixes_count += self.fix_undefined_actions()
@@ -523,6 +709,9 @@ class {class_name}(Action):
         self.fixes_count += self.fix_regex_configuration()
         self.fixes_count += self.create_utterance_templates()
         
+        # Write each modified file once
+        self.save_changes()
+        
         logger.info(f"Completed Rasa conflict fixes: made {self.fixes_count} fixes")
         
         return self.fixes_count
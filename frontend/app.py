@@ -1,10 +1,12 @@
 import streamlit as st
-import requests
-import json
+import httpx
+import orjson
+import functools
 from datetime import datetime
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants
 API_URL = os.getenv("API_URL", "http://localhost:5000/api")
@@ -15,6 +17,9 @@ USER_KEY = "user"
 CONVERSATION_KEY = "conversation_id"
 MESSAGES_KEY = "messages"
 LATEST_UPDATE_KEY = "latest_update"
+HTTP_CLIENT_KEY = "http_client"
+END_CONVERSATION_KEY = "end_conversation_future"
+OLDEST_LOADED_KEY = "oldest_loaded"
 
 # Page names
 LOGIN_PAGE = "Login"
@@ -22,6 +27,15 @@ REGISTER_PAGE = "Register"
 DASHBOARD_PAGE = "Dashboard"
 CHAT_PAGE = "Chat"
 
+# Messages loaded per page of conversation history
+MESSAGE_PAGE_SIZE = 50
+
+# Minimum time between updates of a streaming reply, in seconds
+STREAM_FLUSH_INTERVAL = 0.06
+
+# Runs API calls whose result the UI doesn't wait for
+_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
 def main():
     """Main function for the Streamlit app"""
     # Set page configuration
@@ -41,9 +55,19 @@ def main():
         st.session_state[CONVERSATION_KEY] = None
     if MESSAGES_KEY not in st.session_state:
         st.session_state[MESSAGES_KEY] = []
+    if OLDEST_LOADED_KEY not in st.session_state:
+        st.session_state[OLDEST_LOADED_KEY] = None
     if LATEST_UPDATE_KEY not in st.session_state:
         st.session_state[LATEST_UPDATE_KEY] = "Welcome to the AI Chatbot"
     
+    # Report the outcome of a conversation ended in the background
+    future = st.session_state.get(END_CONVERSATION_KEY)
+    if future is not None and future.done():
+        del st.session_state[END_CONVERSATION_KEY]
+        error_msg = future.result()
+        if error_msg:
+            st.toast(error_msg)
+    
     # Define navigation based on authentication status
     if st.session_state[TOKEN_KEY] is None:
         # User is not logged in
@@ -79,6 +103,7 @@ def main():
                 # Reset conversation when going back to dashboard
                 st.session_state[CONVERSATION_KEY] = None
                 st.session_state[MESSAGES_KEY] = []
+                st.session_state[OLDEST_LOADED_KEY] = None
             
             if st.button("Chat", key="chat_nav"):
                 st.session_state['page'] = CHAT_PAGE
@@ -89,7 +114,9 @@ def main():
             
             if st.button("Logout", key="logout_nav"):
                 # Clear session state
-                for key in [TOKEN_KEY, USER_KEY, CONVERSATION_KEY, MESSAGES_KEY]:
+                set_auth_token(None)
+                clear_cached_api_data()
+                for key in [USER_KEY, CONVERSATION_KEY, MESSAGES_KEY, OLDEST_LOADED_KEY]:
                     st.session_state[key] = None
                 st.session_state['page'] = LOGIN_PAGE
                 st.rerun()
@@ -100,6 +127,34 @@ def main():
         elif st.session_state['page'] == CHAT_PAGE:
             chat_page()
 
+def get_http_client():
+    """
+    Get the HTTP client for this browser session, reusing pooled keep-alive connections to the API across reruns
+    
+    Concurrent requests share a single HTTP/2 connection when the API is served over HTTPS
+    """
+    if HTTP_CLIENT_KEY not in st.session_state:
+        transport = httpx.HTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=8)
+        )
+        st.session_state[HTTP_CLIENT_KEY] = httpx.Client(
+            base_url=API_URL,
+            transport=transport,
+            timeout=httpx.Timeout(30.0, read=120.0)
+        )
+    return st.session_state[HTTP_CLIENT_KEY]
+
+def set_auth_token(token):
+    """Store the auth token and send it with every following API request"""
+    st.session_state[TOKEN_KEY] = token
+    headers = get_http_client().headers
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    else:
+        headers.pop("Authorization", None)
+
 def login_page():
     """Login page"""
     st.title("Login")
@@ -116,15 +171,15 @@ def login_page():
             else:
                 try:
                     # Call login API
-                    response = requests.post(
-                        f"{API_URL}/login",
+                    response = get_http_client().post(
+                        "/login",
                         json={"username": username, "password": password}
                     )
                     
                     if response.status_code == 200:
                         try:
-                            data = response.json()
-                            st.session_state[TOKEN_KEY] = data["token"]
+                            data = _json(response)
+                            set_auth_token(data["token"])
                             st.session_state[USER_KEY] = data["user"]
                             st.session_state['page'] = DASHBOARD_PAGE
                             st.success("Login successful")
@@ -133,11 +188,11 @@ def login_page():
                             st.error(f"Error parsing response: {e}")
                     else:
                         try:
-                            error_msg = response.json().get("error", "Login failed")
+                            error_msg = _json(response).get("error", "Login failed")
                             st.error(error_msg)
                         except:
                             st.error(f"Login failed with status code: {response.status_code}")
-                except requests.RequestException as e:
+                except httpx.HTTPError as e:
                     st.error(f"Connection error: {e}. Is the backend server running?")
                 except Exception as e:
                     st.error(f"Unexpected error: {e}")
@@ -162,15 +217,15 @@ def register_page():
             else:
                 try:
                     # Call register API
-                    response = requests.post(
-                        f"{API_URL}/register",
+                    response = get_http_client().post(
+                        "/register",
                         json={"username": username, "email": email, "password": password}
                     )
                     
                     if response.status_code == 201:
                         try:
-                            data = response.json()
-                            st.session_state[TOKEN_KEY] = data["token"]
+                            data = _json(response)
+                            set_auth_token(data["token"])
                             st.session_state[USER_KEY] = data["user"]
                             st.session_state['page'] = DASHBOARD_PAGE
                             st.success("Registration successful")
@@ -179,11 +234,11 @@ def register_page():
                             st.error(f"Error parsing response: {e}")
                     else:
                         try:
-                            error_msg = response.json().get("error", "Registration failed")
+                            error_msg = _json(response).get("error", "Registration failed")
                             st.error(error_msg)
                         except:
                             st.error(f"Registration failed with status code: {response.status_code}")
-                except requests.RequestException as e:
+                except httpx.HTTPError as e:
                     st.error(f"Connection error: {e}. Is the backend server running?")
                 except Exception as e:
                     st.error(f"Unexpected error: {e}")
@@ -192,13 +247,23 @@ def dashboard_page():
     """Dashboard page"""
     st.title("Dashboard")
     
+    # Get conversations and the latest update in one request
+    try:
+        bundle = get_dashboard_bundle(st.session_state[TOKEN_KEY])
+        if bundle is None:
+            conversations = get_conversations(st.session_state[TOKEN_KEY])
+    except Exception as e:
+        show_api_error(e)
+        bundle, conversations = None, []
+    if bundle is not None:
+        conversations = bundle["conversations"]
+        if bundle.get("latest_update"):
+            st.session_state[LATEST_UPDATE_KEY] = f"Last chat: {format_datetime(bundle['latest_update'])}"
+    
     # Latest Update section
     st.subheader("Latest Update")
     st.info(st.session_state[LATEST_UPDATE_KEY])
     
-    # Get conversations
-    conversations = get_conversations()
-    
     if conversations:
         st.subheader("Your Conversations")
         
@@ -214,6 +279,10 @@ def dashboard_page():
             with col3:
                 if st.button("Open", key=f"open_{conv['id']}"):
                     st.session_state[CONVERSATION_KEY] = conv['id']
+                    # The dashboard bundle already includes the newest conversation's messages
+                    if conv.get('messages'):
+                        st.session_state[MESSAGES_KEY] = add_display_times(conv['messages'])
+                        st.session_state[OLDEST_LOADED_KEY] = oldest_loaded(conv)
                     st.session_state['page'] = CHAT_PAGE
                     st.rerun()
         
@@ -221,6 +290,7 @@ def dashboard_page():
         if st.button("Start New Conversation"):
             st.session_state[CONVERSATION_KEY] = None
             st.session_state[MESSAGES_KEY] = []
+            st.session_state[OLDEST_LOADED_KEY] = None
             st.session_state['page'] = CHAT_PAGE
             st.rerun()
     else:
@@ -230,6 +300,7 @@ def dashboard_page():
         if st.button("Start New Conversation"):
             st.session_state[CONVERSATION_KEY] = None
             st.session_state[MESSAGES_KEY] = []
+            st.session_state[OLDEST_LOADED_KEY] = None
             st.session_state['page'] = CHAT_PAGE
             st.rerun()
 
@@ -252,29 +323,62 @@ def chat_page():
         with col2:
             if st.form_submit_button("End Conversation"):
                 if st.session_state[CONVERSATION_KEY]:
-                    end_conversation(st.session_state[CONVERSATION_KEY])
+                    # Don't keep the user waiting on the request, main() reports failures later
+                    future = _EXECUTOR.submit(
+                        end_conversation,
+                        get_http_client(),
+                        st.session_state[CONVERSATION_KEY],
+                        st.session_state[TOKEN_KEY]
+                    )
+                    # Drop cached data only once the conversation has actually ended,
+                    # otherwise a fetch while the request is in flight caches the old state
+                    future.add_done_callback(lambda _: clear_cached_api_data())
+                    st.session_state[END_CONVERSATION_KEY] = future
                 st.session_state[CONVERSATION_KEY] = None
                 st.session_state[MESSAGES_KEY] = []
+                st.session_state[OLDEST_LOADED_KEY] = None
                 st.session_state['page'] = DASHBOARD_PAGE
                 st.rerun()
         
         if submitted and message:
             # Add user message to UI immediately
+            timestamp = datetime.now().isoformat()
             st.session_state[MESSAGES_KEY].append({
                 "is_user": True,
                 "content": message,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp,
+                "_display_time": format_datetime(timestamp)
             })
             
-            # Send message to API
-            response = send_message(message)
+            with st.chat_message("user"):
+                st.markdown(message)
+            
+            # Send message to API, streaming the reply into the page as it arrives
+            stream = open_message_stream(message)
+            if stream is None:
+                # The API has no streaming endpoint, wait for the whole reply
+                response = send_message(message)
+            elif stream:
+                # Only this bubble updates while streaming, the history above stays static
+                response = {}
+                with st.chat_message("assistant"):
+                    response["text"] = st.empty().write_stream(read_message_stream(stream, response))
+                if "conversation_id" not in response:
+                    response = None
+            else:
+                response = None
             
             if response:
+                # The conversation list and history changed
+                clear_cached_api_data()
+                
                 # Add bot response to UI
+                timestamp = datetime.now().isoformat()
                 st.session_state[MESSAGES_KEY].append({
                     "is_user": False,
                     "content": response["text"],
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": timestamp,
+                    "_display_time": format_datetime(timestamp)
                 })
                 
                 # Set conversation ID if new
@@ -282,7 +386,7 @@ def chat_page():
                     st.session_state[CONVERSATION_KEY] = response["conversation_id"]
                 
                 # Set latest update
-                st.session_state[LATEST_UPDATE_KEY] = f"Last chat: {format_datetime(datetime.now().isoformat())}"
+                st.session_state[LATEST_UPDATE_KEY] = f"Last chat: {format_datetime(timestamp)}"
                 
                 # Rerun to update UI
                 st.rerun()
@@ -291,32 +395,39 @@ def display_messages():
     """Display messages in the chat"""
     # Get conversation history if needed
     if st.session_state[CONVERSATION_KEY] and not st.session_state[MESSAGES_KEY]:
-        fetch_conversation(st.session_state[CONVERSATION_KEY])
+        try:
+            data = fetch_conversation(st.session_state[CONVERSATION_KEY], st.session_state[TOKEN_KEY])
+        except Exception as e:
+            show_api_error(e)
+            data = None
+        if data:
+            st.session_state[MESSAGES_KEY] = add_display_times(data["messages"])
+            st.session_state[OLDEST_LOADED_KEY] = oldest_loaded(data)
     
-    # Create a container for messages
-    message_container = st.container()
+    # Only the newest page is loaded up front, older ones are prepended on request
+    if st.session_state[OLDEST_LOADED_KEY] and st.button("Load older messages"):
+        try:
+            data = fetch_conversation(
+                st.session_state[CONVERSATION_KEY],
+                st.session_state[TOKEN_KEY],
+                st.session_state[OLDEST_LOADED_KEY]
+            )
+        except Exception as e:
+            show_api_error(e)
+            data = None
+        if data:
+            st.session_state[MESSAGES_KEY] = add_display_times(data["messages"]) + st.session_state[MESSAGES_KEY]
+            st.session_state[OLDEST_LOADED_KEY] = oldest_loaded(data)
     
-    with message_container:
-        for msg in st.session_state[MESSAGES_KEY]:
-            col1, col2 = st.columns([1, 7])
-            
-            with col1:
-                if msg["is_user"]:
-                    st.write("You:")
-                else:
-                    st.write("Bot:")
-            
-            with col2:
-                if msg["is_user"]:
-                    st.text_area("", msg["content"], height=50, key=f"msg_{msg['timestamp']}", disabled=True, 
-                                label_visibility="collapsed")
-                else:
-                    st.info(msg["content"])
+    # Render the history as static chat bubbles, without any per-message widgets
+    for msg in st.session_state[MESSAGES_KEY]:
+        with st.chat_message("user" if msg["is_user"] else "assistant"):
+            st.markdown(msg["content"])
+            st.caption(msg["_display_time"])
 
 def send_message(message):
     """Send a message to the API"""
     try:
-        headers = {"Authorization": f"Bearer {st.session_state[TOKEN_KEY]}"}
         data = {
             "message": message
         }
@@ -324,128 +435,219 @@ def send_message(message):
         if st.session_state[CONVERSATION_KEY]:
             data["conversation_id"] = st.session_state[CONVERSATION_KEY]
         
-        response = requests.post(
-            f"{API_URL}/chat",
+        response = get_http_client().post(
+            "/chat",
             json=data,
-            headers=headers,
             timeout=120  # Increased timeout
         )
         
         if response.status_code == 200:
             try:
-                return response.json()
+                return _json(response)
             except Exception as e:
                 st.error(f"Error parsing response: {e}")
                 return None
         else:
             try:
-                error_msg = response.json().get("error", "Failed to send message")
+                error_msg = _json(response).get("error", "Failed to send message")
                 st.error(f"Error: {error_msg}")
             except:
                 st.error(f"Failed to send message. Status code: {response.status_code}")
             return None
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {e}. Is the backend server running?")
         return None
     except Exception as e:
         st.error(f"Unexpected error: {e}")
         return None
 
-def get_conversations():
-    """Get conversations from the API"""
+def open_message_stream(message):
+    """Send a message to the streaming chat API
+    
+    Returns the open streaming response, None if the API has no streaming endpoint,
+    or False if the request failed
+    """
     try:
-        headers = {"Authorization": f"Bearer {st.session_state[TOKEN_KEY]}"}
-        response = requests.get(
-            f"{API_URL}/conversations",
-            headers=headers,
-            timeout=30  # Increased timeout
+        data = {
+            "message": message
+        }
+        
+        if st.session_state[CONVERSATION_KEY]:
+            data["conversation_id"] = st.session_state[CONVERSATION_KEY]
+        
+        client = get_http_client()
+        request = client.build_request(
+            "POST",
+            "/chat/stream",
+            json=data,
+            timeout=httpx.Timeout(120.0, connect=5.0)  # Connect quickly, but allow a slow reply
         )
+        response = client.send(request, stream=True)
         
         if response.status_code == 200:
-            try:
-                return response.json()
-            except Exception as e:
-                st.error(f"Error parsing response: {e}")
-                return []
-        else:
-            try:
-                error_msg = response.json().get("error", "Failed to get conversations")
-                st.error(f"Error: {error_msg}")
-            except:
-                st.error(f"Failed to get conversations. Status code: {response.status_code}")
-            return []
-    except requests.RequestException as e:
+            return response
+        
+        response.close()
+        if response.status_code == 404:
+            return None
+        st.error(f"Failed to send message. Status code: {response.status_code}")
+        return False
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {e}. Is the backend server running?")
-        return []
-    except Exception as e:
-        st.error(f"Unexpected error: {e}")
-        return []
+        return False
 
-def fetch_conversation(conversation_id):
-    """Fetch conversation history from the API"""
+def read_message_stream(response, reply):
+    """
+    Yield the reply text from a streaming chat response as it arrives, storing its metadata in reply
+    
+    Tokens are buffered and yielded at most every STREAM_FLUSH_INTERVAL seconds, or at a
+    paragraph break, so the placeholder isn't redrawn for every single token
+    """
+    buffer = []
+    last_flush = time.monotonic()
     try:
-        headers = {"Authorization": f"Bearer {st.session_state[TOKEN_KEY]}"}
-        response = requests.get(
-            f"{API_URL}/conversations/{conversation_id}",
-            headers=headers,
-            timeout=30  # Increased timeout
-        )
-        
-        if response.status_code == 200:
-            try:
-                data = response.json()
-                st.session_state[MESSAGES_KEY] = data["messages"]
-                return data
-            except Exception as e:
-                st.error(f"Error parsing response: {e}")
-                return None
-        else:
-            try:
-                error_msg = response.json().get("error", "Failed to fetch conversation")
-                st.error(f"Error: {error_msg}")
-            except:
-                st.error(f"Failed to fetch conversation. Status code: {response.status_code}")
-            return None
-    except requests.RequestException as e:
+        for line in response.iter_lines():
+            # Each server-sent event is a single "data: {...}" line
+            if not line.startswith("data: "):
+                continue
+            event = orjson.loads(line[6:])
+            if "token" in event:
+                buffer.append(event["token"])
+                now = time.monotonic()
+                if now - last_flush >= STREAM_FLUSH_INTERVAL or "\n\n" in event["token"]:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    last_flush = now
+            elif "error" in event:
+                st.error(f"Error: {event['error']}")
+            else:
+                reply.update(event)
+    except httpx.HTTPError as e:
         st.error(f"Connection error: {e}. Is the backend server running?")
+    finally:
+        response.close()
+    
+    if buffer:
+        yield "".join(buffer)
+
+class APIError(Exception):
+    """An API request that the backend answered with an error, with a message to show the user"""
+
+def check_response(response, default_error):
+    """Raise an APIError unless the response succeeded"""
+    if response.status_code == 200:
+        return
+    try:
+        error_msg = _json(response).get("error", default_error)
+    except Exception:
+        raise APIError(f"{default_error}. Status code: {response.status_code}")
+    raise APIError(f"Error: {error_msg}")
+
+def show_api_error(error):
+    """Show the error raised by one of the cached API helpers"""
+    if isinstance(error, APIError):
+        st.error(str(error))
+    elif isinstance(error, httpx.HTTPError):
+        st.error(f"Connection error: {error}. Is the backend server running?")
+    else:
+        st.error(f"Unexpected error: {error}")
+
+# The cached API helpers below raise on failure instead of showing errors,
+# so that failures are never cached and no UI calls are replayed on cache hits
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_dashboard_bundle(token):
+    """
+    Get the user, conversations and latest update for the dashboard in one request
+    
+    Cached per auth token. Returns None if the API has no dashboard endpoint
+    """
+    response = get_http_client().get(
+        "/dashboard",
+        timeout=30
+    )
+    if response.status_code == 404:
         return None
-    except Exception as e:
-        st.error(f"Unexpected error: {e}")
-        return None
+    check_response(response, "Failed to load dashboard")
+    return _json(response)
 
-def end_conversation(conversation_id):
-    """End a conversation"""
+@st.cache_data(ttl=30, show_spinner=False)
+def get_conversations(token):
+    """Get conversations from the API, cached per auth token"""
+    response = get_http_client().get(
+        "/conversations",
+        timeout=30  # Increased timeout
+    )
+    check_response(response, "Failed to get conversations")
+    return _json(response)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_conversation(conversation_id, token, before=None):
+    """Fetch a page of conversation history from the API, cached per auth token
+    
+    Returns the newest messages, or those sent before the given timestamp
+    """
+    response = get_http_client().get(
+        f"/conversations/{conversation_id}",
+        params={"limit": MESSAGE_PAGE_SIZE, "before": before} if before else {"limit": MESSAGE_PAGE_SIZE},
+        timeout=30  # Increased timeout
+    )
+    check_response(response, "Failed to fetch conversation")
+    return _json(response)
+
+def end_conversation(client, conversation_id, token):
+    """
+    End a conversation
+    
+    Runs in a background thread, so it takes the HTTP client and token explicitly
+    and returns an error message instead of showing it, or None on success
+    """
     try:
-        headers = {"Authorization": f"Bearer {st.session_state[TOKEN_KEY]}"}
-        response = requests.put(
-            f"{API_URL}/conversations/{conversation_id}",
-            headers=headers,
+        response = client.put(
+            f"/conversations/{conversation_id}",
+            headers={"Authorization": f"Bearer {token}"},
             timeout=30  # Increased timeout
         )
         
         if response.status_code == 200:
-            return True
+            return None
         else:
             try:
-                error_msg = response.json().get("error", "Failed to end conversation")
-                st.error(f"Error: {error_msg}")
+                error_msg = _json(response).get("error", "Failed to end conversation")
+                return f"Error: {error_msg}"
             except:
-                st.error(f"Failed to end conversation. Status code: {response.status_code}")
-            return False
-    except requests.RequestException as e:
-        st.error(f"Connection error: {e}. Is the backend server running?")
-        return False
+                return f"Failed to end conversation. Status code: {response.status_code}"
+    except httpx.HTTPError as e:
+        return f"Connection error: {e}. Is the backend server running?"
     except Exception as e:
-        st.error(f"Unexpected error: {e}")
-        return False
+        return f"Unexpected error: {e}"
 
+def oldest_loaded(data):
+    """Get the timestamp to load older messages before, or None if the whole history is loaded"""
+    if data.get("has_more") and data["messages"]:
+        return data["messages"][0]["timestamp"]
+    return None
+
+def clear_cached_api_data():
+    """Drop cached API responses after the user's conversations changed"""
+    get_dashboard_bundle.clear()
+    get_conversations.clear()
+    fetch_conversation.clear()
+
+def _json(response):
+    """Parse a JSON response body with orjson, straight from the raw bytes"""
+    return orjson.loads(response.content)
+
+@functools.lru_cache(maxsize=2048)
 def format_datetime(dt_string):
     """Format datetime string for display"""
-    if "T" in dt_string:
-        dt = datetime.fromisoformat(dt_string)
-    else:
-        dt = datetime.fromisoformat(dt_string.replace("Z", "+00:00"))
-    return dt.strftime("%Y-%m-%d %H:%M")
+    return datetime.fromisoformat(dt_string.replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M")
+
+def add_display_times(messages):
+    """Format each message's timestamp once as it arrives from the API, so reruns don't reparse it"""
+    for msg in messages:
+        msg["_display_time"] = format_datetime(msg["timestamp"])
+    return messages
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
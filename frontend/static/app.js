@@ -0,0 +1,352 @@
+// Browser client for the chatbot, served by the backend next to the API it calls.
+// Chat replies are streamed into a single text node, so sending a message only
+// touches the DOM of the new bubbles instead of re-rendering the whole history.
+
+const API_URL = "/api";
+
+// Messages loaded per page of conversation history
+const MESSAGE_PAGE_SIZE = 50;
+
+const state = {
+  token: sessionStorage.getItem("token"),
+  user: JSON.parse(sessionStorage.getItem("user") || "null"),
+  conversationId: null,
+  oldestLoaded: null,
+  stream: null  // AbortController of the reply being streamed
+};
+
+const $ = (id) => document.getElementById(id);
+
+async function api(path, { json, ...options } = {}) {
+  const headers = { ...options.headers };
+  if (state.token) {
+    headers.Authorization = `Bearer ${state.token}`;
+  }
+  if (json !== undefined) {
+    headers["Content-Type"] = "application/json";
+    options.body = JSON.stringify(json);
+  }
+
+  const response = await fetch(API_URL + path, { ...options, headers });
+  if (response.status === 401 && state.token) {
+    logout();
+    throw new Error("Your session has expired, please log in again");
+  }
+  return response;
+}
+
+async function apiJson(path, options) {
+  const response = await api(path, options);
+  const data = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    throw new Error(data.error || data.message || `Request failed with status code: ${response.status}`);
+  }
+  return data;
+}
+
+function showError(message) {
+  $("error").textContent = message;
+  $("error").hidden = !message;
+}
+
+function formatDateTime(value) {
+  // Same "YYYY-MM-DD HH:MM" format as the Streamlit frontend, without a timezone conversion
+  return value.replace("T", " ").slice(0, 16);
+}
+
+function localTimestamp() {
+  // ISO 8601 in local time, like the timestamps the backend stores
+  const now = new Date();
+  return new Date(now - now.getTimezoneOffset() * 60000).toISOString().slice(0, 19);
+}
+
+function showPage(page) {
+  showError("");
+  for (const section of document.querySelectorAll("main > section")) {
+    section.hidden = section.id !== `page-${page}`;
+  }
+  $("nav-guest").hidden = Boolean(state.token);
+  $("nav-user").hidden = !state.token;
+  $("sidebar-title").textContent = state.user ? `Welcome, ${state.user.username}` : "AI Chatbot";
+}
+
+function setAuth(data) {
+  state.token = data.token;
+  state.user = data.user;
+  sessionStorage.setItem("token", data.token);
+  sessionStorage.setItem("user", JSON.stringify(data.user));
+}
+
+function logout() {
+  if (state.stream) {
+    state.stream.abort();
+  }
+  state.token = null;
+  state.user = null;
+  sessionStorage.clear();
+  resetConversation();
+  showPage("login");
+}
+
+// Auth pages
+
+async function submitLogin(event) {
+  event.preventDefault();
+  const form = new FormData(event.target);
+  const username = form.get("username");
+  const password = form.get("password");
+  if (!username || !password) {
+    showError("Please enter username and password");
+    return;
+  }
+
+  try {
+    setAuth(await apiJson("/login", { method: "POST", json: { username, password } }));
+    openDashboard();
+  } catch (error) {
+    showError(error.message);
+  }
+}
+
+async function submitRegister(event) {
+  event.preventDefault();
+  const form = new FormData(event.target);
+  const username = form.get("username");
+  const email = form.get("email");
+  const password = form.get("password");
+  if (!username || !email || !password) {
+    showError("Please fill all required fields");
+    return;
+  }
+  if (password !== form.get("confirm_password")) {
+    showError("Passwords do not match");
+    return;
+  }
+
+  try {
+    setAuth(await apiJson("/register", { method: "POST", json: { username, email, password } }));
+    openDashboard();
+  } catch (error) {
+    showError(error.message);
+  }
+}
+
+// Dashboard
+
+async function openDashboard() {
+  resetConversation();
+  showPage("dashboard");
+
+  let bundle;
+  try {
+    bundle = await apiJson("/dashboard");
+  } catch (error) {
+    showError(error.message);
+    return;
+  }
+
+  if (bundle.latest_update) {
+    $("latest-update").textContent = `Last chat: ${formatDateTime(bundle.latest_update)}`;
+  }
+
+  const items = bundle.conversations.map((conversation) => {
+    const item = document.createElement("li");
+    const lastMessage = document.createElement("strong");
+    lastMessage.textContent = conversation.last_message || "No messages";
+    const started = document.createElement("span");
+    started.textContent = `Started: ${formatDateTime(conversation.start_time)}`;
+    const open = document.createElement("button");
+    open.textContent = "Open";
+    open.addEventListener("click", () => openConversation(conversation));
+    item.append(lastMessage, started, open);
+    return item;
+  });
+  $("conversations").replaceChildren(...items);
+  if (!items.length) {
+    $("conversations").textContent = "No conversations yet.";
+  }
+}
+
+// Chat
+
+function resetConversation() {
+  state.conversationId = null;
+  state.oldestLoaded = null;
+  $("messages").replaceChildren();
+  $("load-older").hidden = true;
+}
+
+function messageElement(message) {
+  const element = document.createElement("div");
+  element.className = `message ${message.is_user ? "user" : "assistant"}`;
+  element.append(document.createTextNode(message.content));
+  const time = document.createElement("time");
+  time.textContent = formatDateTime(message.timestamp);
+  element.append(time);
+  return element;
+}
+
+function showMessagePage(data) {
+  // Prepend the page, it is always older than what is already shown
+  $("messages").prepend(...data.messages.map(messageElement));
+  state.oldestLoaded = data.has_more && data.messages.length ? data.messages[0].timestamp : null;
+  $("load-older").hidden = !state.oldestLoaded;
+}
+
+async function openConversation(conversation) {
+  resetConversation();
+  state.conversationId = conversation.id;
+  showPage("chat");
+
+  // The dashboard already includes the newest conversation's messages
+  if (conversation.messages) {
+    showMessagePage(conversation);
+    return;
+  }
+  await loadMessagePage();
+}
+
+async function loadMessagePage(before) {
+  const params = new URLSearchParams({ limit: MESSAGE_PAGE_SIZE });
+  if (before) {
+    params.set("before", before);
+  }
+
+  try {
+    showMessagePage(await apiJson(`/conversations/${state.conversationId}?${params}`));
+  } catch (error) {
+    showError(error.message);
+  }
+}
+
+async function readReplyStream(response, reply) {
+  // Tokens are appended to the reply's text node at most once per animation frame
+  let pending = "";
+  let frame = 0;
+  const flush = () => {
+    reply.appendData(pending);
+    pending = "";
+    frame = 0;
+  };
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Each server-sent event is a single "data: {...}" line followed by a blank line
+    const events = buffer.split("\n\n");
+    buffer = events.pop();
+    for (const line of events) {
+      if (!line.startsWith("data: ")) {
+        continue;
+      }
+      const event = JSON.parse(line.slice(6));
+      if ("token" in event) {
+        pending += event.token;
+        frame = frame || requestAnimationFrame(flush);
+      } else if ("error" in event) {
+        showError(`Error: ${event.error}`);
+      } else if (event.conversation_id) {
+        state.conversationId = event.conversation_id;
+      }
+    }
+  }
+
+  cancelAnimationFrame(frame);
+  flush();
+}
+
+async function sendMessage(message) {
+  const timestamp = localTimestamp();
+  const body = { message };
+  if (state.conversationId) {
+    body.conversation_id = state.conversationId;
+  }
+
+  $("messages").append(messageElement({ is_user: true, content: message, timestamp }));
+  const bubble = messageElement({ is_user: false, content: "", timestamp });
+  $("messages").append(bubble);
+
+  state.stream = new AbortController();
+  try {
+    const response = await api("/chat/stream", { method: "POST", json: body, signal: state.stream.signal });
+    if (response.status === 404) {
+      // The API has no streaming endpoint, wait for the whole reply
+      const data = await apiJson("/chat", { method: "POST", json: body, signal: state.stream.signal });
+      bubble.firstChild.appendData(data.text);
+      state.conversationId = state.conversationId || data.conversation_id;
+    } else if (response.ok) {
+      await readReplyStream(response, bubble.firstChild);
+    } else {
+      throw new Error(`Failed to send message. Status code: ${response.status}`);
+    }
+    $("latest-update").textContent = `Last chat: ${formatDateTime(timestamp)}`;
+  } catch (error) {
+    bubble.remove();
+    if (error.name !== "AbortError") {
+      showError(error.name === "TypeError" ? "Connection error. Is the backend server running?" : error.message);
+    }
+  } finally {
+    state.stream = null;
+  }
+}
+
+async function submitMessage(event) {
+  event.preventDefault();
+  const input = event.target.elements.message;
+  const message = input.value.trim();
+  if (!message || state.stream) {
+    return;
+  }
+  input.value = "";
+  showError("");
+  await sendMessage(message);
+}
+
+function endConversation() {
+  if (state.stream) {
+    state.stream.abort();
+  }
+  if (state.conversationId) {
+    // Don't keep the user waiting on the request, only report a failure
+    api(`/conversations/${state.conversationId}`, { method: "PUT" })
+      .then((response) => response.ok || showError(`Failed to end conversation. Status code: ${response.status}`))
+      .catch((error) => showError(error.message));
+  }
+  openDashboard();
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  for (const button of document.querySelectorAll("nav button[data-page]")) {
+    const page = button.dataset.page;
+    button.addEventListener("click", () => {
+      if (page === "dashboard") {
+        openDashboard();
+      } else {
+        showPage(page);
+      }
+    });
+  }
+  $("logout").addEventListener("click", logout);
+  $("login-form").addEventListener("submit", submitLogin);
+  $("register-form").addEventListener("submit", submitRegister);
+  $("new-conversation").addEventListener("click", () => {
+    resetConversation();
+    showPage("chat");
+  });
+  $("load-older").addEventListener("click", () => loadMessagePage(state.oldestLoaded));
+  $("message-form").addEventListener("submit", submitMessage);
+  $("end-conversation").addEventListener("click", endConversation);
+
+  if (state.token) {
+    openDashboard();
+  } else {
+    showPage("login");
+  }
+});
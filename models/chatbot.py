@@ -2,6 +2,7 @@ import sys
 import os
 import json
 from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
 import random
 
@@ -40,12 +41,21 @@ class Chatbot:
         if "postgresql" in db_url:
             engine_args = {
                 "pool_pre_ping": True,
-                "pool_recycle": 300,
+                "pool_recycle": 1800,
                 "pool_size": 10,
                 "max_overflow": 20,
+                "pool_use_lifo": True,  # Reuse the most recently returned (warm) connection
                 "connect_args": {"connect_timeout": 30}
             }
             print("Configuring PostgreSQL connection settings for chatbot")
+        elif db_url.startswith("sqlite"):
+            # Keep SQLite connections open between requests instead of reconnecting each time
+            engine_args = {
+                "poolclass": QueuePool,
+                "pool_size": 10,
+                "max_overflow": 10,
+                "connect_args": {"check_same_thread": False}
+            }
         
         self.engine = create_engine(self.db_url, **engine_args)
         self.Session = sessionmaker(bind=self.engine)
@@ -5,15 +5,15 @@ Script to start only the backend server
 import os
 import sys
 import importlib.util
-from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from database.setup_db import setup_database
+from utils.env import load_env
 
 if __name__ == "__main__":
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Setup database
     print("Setting up database...")
@@ -40,11 +40,11 @@ if __name__ == "__main__":
     # Get the Flask app instance
     app = backend_module.app
     
-    # Run the Flask app
+    # Run the Flask app with the production WSGI server
     port = int(os.getenv("PORT", 5000))
     print(f"Backend server running on http://localhost:{port}")
     print("Press Ctrl+C to stop")
     # Disable debug mode to prevent auto-reloading issues
     app.config['PERMANENT_SESSION_LIFETIME'] = 1800  # 30 minutes
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max request size
-    app.run(host='0.0.0.0', port=port, debug=False, threaded=True) 
\ No newline at end of file
+    backend_module.serve_app(port, debug=False)
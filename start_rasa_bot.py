@@ -4,13 +4,13 @@ Script to start the Rasa chatbot with PostgreSQL integration
 
 import os
 import sys
-import time
 import argparse
-from dotenv import load_dotenv
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from utils.rasa_integration import RasaIntegration
+from utils.rasa_integration import RasaIntegration, RASA_NAMES
+from utils.process_utils import wait_for_exit, stop_processes
+from utils.env import load_env
 
 def check_postgresql_connection():
     """Check if PostgreSQL connection is working"""
@@ -20,7 +20,7 @@ def check_postgresql_connection():
         from sqlalchemy import create_engine
         
         # Load environment variables
-        load_dotenv()
+        load_env()
         
         # Get PostgreSQL connection string
         db_url = os.getenv("DATABASE_URL")
@@ -54,7 +54,7 @@ def main():
     args = parser.parse_args()
     
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Check PostgreSQL connection
     if not check_postgresql_connection():
@@ -93,18 +93,18 @@ def main():
         print("Action server: http://localhost:5055")
         print("=========================================\n")
         
-        # Keep running until interrupted
+        # Keep running until interrupted, restarting a server only when it exits
+        processes = {"rasa": rasa_server_process, "action": action_server_process}
         try:
             while True:
-                time.sleep(1)
+                name = wait_for_exit(processes)
+                print(f"{RASA_NAMES[name]} stopped unexpectedly. Restarting...")
+                processes[name] = rasa_integration.restart_rasa_server(name)
         except KeyboardInterrupt:
             print("\nShutting down Rasa servers...")
             
-            # Terminate processes
-            if rasa_server_process:
-                rasa_server_process.terminate()
-            if action_server_process:
-                action_server_process.terminate()
+            # Terminate processes and wait for them to exit
+            stop_processes(processes)
             
             print("Rasa servers stopped.")
     
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Make the project packages importable when pytest runs from any directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+import backend.app as backend_app
+from database.models import Base, Conversation, Message, User
+from utils.auth import generate_token, hash_password
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """Point the backend at an empty SQLite database of its own"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    Session = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+    monkeypatch.setattr(backend_app, "Session", Session)
+    yield Session
+    Session.remove()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    return backend_app.app.test_client()
+
+
+@pytest.fixture
+def user(session_factory):
+    with session_factory() as session, session.begin():
+        user = User(username="alice", email="alice@example.com", password_hash=hash_password("secret"))
+        session.add(user)
+    return user
+
+
+def auth_headers(user):
+    return {"Authorization": f"Bearer {generate_token(user.id, user.username)}"}
+
+
+def add_conversation(session_factory, user, num_messages, start=datetime(2026, 10, 1, 10, 0, 0)):
+    with session_factory() as session, session.begin():
+        conversation = Conversation(user_id=user.id, start_time=start)
+        session.add(conversation)
+        session.flush()
+        session.add_all([
+            Message(
+                conversation_id=conversation.id,
+                is_user=index % 2 == 0,
+                content=f"message {index}",
+                timestamp=start + timedelta(seconds=index)
+            )
+            for index in range(num_messages)
+        ])
+    return conversation.id
+
+
+def test_register_creates_user_and_rejects_duplicates(client, session_factory):
+    response = client.post("/api/register", json={"username": "bob", "email": "bob@example.com", "password": "pw"})
+    assert response.status_code == 201
+    assert response.get_json()["user"]["username"] == "bob"
+    assert response.get_json()["token"]
+    
+    response = client.post("/api/register", json={"username": "bob", "email": "other@example.com", "password": "pw"})
+    assert response.status_code == 400
+    
+    with session_factory() as session:
+        assert session.query(User).count() == 1
+
+
+def test_register_reports_unique_constraint_race_as_duplicate(client, session_factory, user, monkeypatch):
+    # Simulate a concurrent registration that took the username after the existence checks
+    monkeypatch.setattr(backend_app, "USERNAME_EXISTS", select(literal(False)))
+    monkeypatch.setattr(backend_app, "EMAIL_EXISTS", select(literal(False)))
+    
+    response = client.post("/api/register", json={"username": "alice", "email": "new@example.com", "password": "pw"})
+    
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Username or email already exists"
+    with session_factory() as session:
+        assert session.query(User).count() == 1
+
+
+def test_login_updates_last_login_with_local_time(client, session_factory, user):
+    before = datetime.now()
+    response = client.post("/api/login", json={"username": "alice", "password": "secret"})
+    assert response.status_code == 200
+    
+    with session_factory() as session:
+        last_login = session.get(User, user.id).last_login
+    assert before <= last_login <= datetime.now()
+
+
+def test_login_rejects_wrong_password(client, user):
+    response = client.post("/api/login", json={"username": "alice", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_end_conversation_sets_end_time(client, session_factory, user):
+    conversation_id = add_conversation(session_factory, user, 2, start=datetime.now() - timedelta(minutes=5))
+    
+    response = client.put(f"/api/conversations/{conversation_id}", headers=auth_headers(user))
+    assert response.status_code == 200
+    
+    with session_factory() as session:
+        conversation = session.get(Conversation, conversation_id)
+        assert conversation.end_time is not None
+        assert 290 < conversation.duration < 310
+
+
+def test_end_conversation_of_other_user_is_not_found(client, session_factory, user):
+    conversation_id = add_conversation(session_factory, user, 1)
+    with session_factory() as session, session.begin():
+        other = User(username="mallory", email="mallory@example.com", password_hash="x")
+        session.add(other)
+    
+    response = client.put(f"/api/conversations/{conversation_id}", headers=auth_headers(other))
+    assert response.status_code == 404
+    response = client.put("/api/conversations/999", headers=auth_headers(user))
+    assert response.status_code == 404
+    
+    with session_factory() as session:
+        assert session.get(Conversation, conversation_id).end_time is None
+
+
+def test_dashboard_bundles_conversations_with_newest_messages(client, session_factory, user):
+    add_conversation(session_factory, user, 3, start=datetime(2026, 9, 1))
+    newest_id = add_conversation(session_factory, user, 60, start=datetime(2026, 10, 1))
+    
+    response = client.get("/api/dashboard", headers=auth_headers(user))
+    assert response.status_code == 200
+    data = response.get_json()
+    
+    assert data["user"]["username"] == "alice"
+    conversations = data["conversations"]
+    assert [conversation["id"] for conversation in conversations][0] == newest_id
+    assert conversations[0]["last_message"] == "message 59"
+    assert len(conversations[0]["messages"]) == backend_app.MESSAGE_PAGE_SIZE
+    assert conversations[0]["messages"][-1]["content"] == "message 59"
+    assert conversations[0]["has_more"] is True
+    assert "messages" not in conversations[1]
+    assert data["latest_update"] == "2026-10-01T00:00:59"
+
+
+def test_conversation_pages_walk_back_through_history(client, session_factory, user):
+    conversation_id = add_conversation(session_factory, user, 120)
+    headers = auth_headers(user)
+    
+    pages = []
+    params = {"limit": 50}
+    while True:
+        data = client.get(f"/api/conversations/{conversation_id}", query_string=params, headers=headers).get_json()
+        pages.append([message["content"] for message in data["messages"]])
+        if not data["has_more"]:
+            break
+        params["before"] = data["messages"][0]["timestamp"]
+    
+    assert [len(page) for page in pages] == [50, 50, 20]
+    assert pages[0][0] == "message 70" and pages[0][-1] == "message 119"
+    assert pages[2][0] == "message 0"
+    
+    # Without a limit the whole history is returned
+    data = client.get(f"/api/conversations/{conversation_id}", headers=headers).get_json()
+    assert len(data["messages"]) == 120
+    assert "has_more" not in data
+
+
+def test_conversation_page_rejects_invalid_before(client, session_factory, user):
+    conversation_id = add_conversation(session_factory, user, 1)
+    response = client.get(
+        f"/api/conversations/{conversation_id}",
+        query_string={"limit": 5, "before": "yesterday"},
+        headers=auth_headers(user)
+    )
+    assert response.status_code == 400
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.migrate_orders import (
+    ORDER_COLUMNS, ORDER_ITEM_COLUMNS, ORDER_NUMBER_START, generate_order_numbers, generate_orders, write_orders
+)
+from database.models import Base, Order, OrderItem, User
+
+
+def test_generate_orders_returns_aligned_column_buffers():
+    orders, order_items = generate_orders([1, 2, 3], 200, rng=np.random.default_rng(0))
+    
+    assert set(orders) == set(ORDER_COLUMNS) - {'id'}
+    assert set(order_items) == set(ORDER_ITEM_COLUMNS)
+    assert all(len(values) == 200 for values in orders.values())
+    num_items = len(order_items['order_id'])
+    assert all(len(values) == num_items for values in order_items.values())
+    
+    # Items reference order positions, each order has 1-5 distinct products
+    positions = order_items['order_id']
+    assert positions == sorted(positions)
+    assert set(positions) == set(range(200))
+    for position in range(200):
+        products = [name for order_id, name in zip(positions, order_items['product_name']) if order_id == position]
+        assert 1 <= len(products) <= 5
+        assert len(set(products)) == len(products)
+    
+    # Order totals are the sum of their line totals
+    line_totals = np.array(order_items['price']) * np.array(order_items['quantity'])
+    totals = np.bincount(positions, weights=line_totals)
+    assert np.allclose(orders['total_amount'], totals, atol=0.01)
+    
+    assert len(set(orders['order_number'])) == 200
+    assert set(orders['user_id']) <= {1, 2, 3}
+    assert all(delivered is None or delivered >= ordered
+               for ordered, delivered in zip(orders['ordered_at'], orders['delivered_at']))
+
+
+def test_generate_orders_handles_no_orders():
+    orders, order_items = generate_orders([1], 0, rng=np.random.default_rng(0))
+    assert all(values == [] for values in orders.values())
+    assert all(values == [] for values in order_items.values())
+
+
+def test_order_numbers_skip_taken_numbers():
+    taken = list(range(ORDER_NUMBER_START, ORDER_NUMBER_START + 89000))
+    numbers = generate_order_numbers(np.random.default_rng(0), 1000, taken)
+    
+    assert len(numbers) == 1000
+    assert len(set(numbers.tolist())) == 1000
+    assert not set(numbers.tolist()) & set(taken)
+
+
+def test_order_numbers_widen_beyond_five_digits_for_large_batches():
+    numbers = generate_order_numbers(np.random.default_rng(0), 95000)
+    assert len(set(numbers.tolist())) == 95000
+    assert numbers.min() >= ORDER_NUMBER_START
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'orders.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": 1, "username": "alice", "email": "a@example.com", "password_hash": "x"}])
+    yield engine
+    engine.dispose()
+
+
+def test_write_orders_inserts_orders_and_linked_items_on_sqlite(engine):
+    orders, order_items = generate_orders([1], 30, rng=np.random.default_rng(1))
+    write_orders(engine, orders, order_items)
+    
+    # A second batch is numbered after the first
+    more_orders, more_items = generate_orders([1], 10, rng=np.random.default_rng(2))
+    write_orders(engine, more_orders, more_items)
+    
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        assert [order_id for (order_id,) in session.query(Order.id).order_by(Order.id)] == list(range(1, 41))
+        assert session.query(OrderItem).count() == len(order_items['product_name']) + len(more_items['product_name'])
+        
+        for order in session.query(Order):
+            assert order.order_items
+            assert abs(sum(item.price * item.quantity for item in order.order_items) - order.total_amount) < 0.01
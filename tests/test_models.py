@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base, Conversation, seconds_between
+
+
+def compile_duration(dialect):
+    statement = select(seconds_between(Conversation.start_time, Conversation.end_time))
+    return str(statement.compile(dialect=dialect))
+
+
+def test_seconds_between_compiles_to_julianday_on_sqlite():
+    sql = compile_duration(sqlite.dialect())
+    assert "(julianday(conversations.end_time) - julianday(conversations.start_time)) * 86400" in sql
+
+
+def test_seconds_between_compiles_to_epoch_extract_on_postgresql():
+    sql = compile_duration(postgresql.dialect())
+    assert "EXTRACT(EPOCH FROM (conversations.end_time - conversations.start_time))" in sql
+
+
+def test_duration_is_computed_by_sqlite():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    start = datetime(2026, 10, 1, 10, 0, 0)
+    
+    with Session() as session:
+        session.add_all([
+            Conversation(id=1, start_time=start, end_time=start + timedelta(minutes=1, seconds=30)),
+            Conversation(id=2, start_time=start)
+        ])
+        session.commit()
+        
+        durations = dict(session.query(Conversation.id, Conversation.duration))
+    
+    assert abs(durations[1] - 90) < 0.01
+    assert durations[2] is None
@@ -0,0 +1,136 @@
+import importlib
+import os
+import time
+
+import pytest
+import yaml
+
+FullLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+NLU_YAML = """\
+version: "3.1"
+nlu:
+- intent: greet
+  examples: |
+    - hi
+    - hello [there](target)
+- intent: order
+  examples: |-
+    - I want [shoes](product)
+  metadata: {source: manual, tags: [a, b]}
+- regex: zip
+  examples: |
+    - \\d{5}
+- synonym: colour
+  examples: &colours
+    - red
+    - blue
+responses:
+  utter_greet:
+  - text: "Hi!"
+"""
+
+
+@pytest.fixture(scope="module")
+def check_module(tmp_path_factory):
+    return import_from_scratch_dir("check_rasa_conflicts", tmp_path_factory)
+
+
+@pytest.fixture(scope="module")
+def fix_module(tmp_path_factory):
+    return import_from_scratch_dir("fix_rasa_conflicts", tmp_path_factory)
+
+
+def import_from_scratch_dir(name, tmp_path_factory):
+    """Import a Rasa tool from a scratch directory, since importing it opens a log file in the working directory"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("logs"))
+    try:
+        return importlib.import_module(name)
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.mark.parametrize("key", ["nlu", "responses", "missing"])
+def test_iter_yaml_list_items_matches_full_load(check_module, tmp_path, key):
+    path = tmp_path / "nlu.yml"
+    path.write_text(NLU_YAML, encoding="utf-8")
+    
+    expected = yaml.load(NLU_YAML, Loader=FullLoader).get(key)
+    items = list(check_module.iter_yaml_list_items(str(path), key))
+    
+    assert items == (expected if isinstance(expected, list) else [])
+
+
+def test_iter_yaml_list_items_handles_empty_and_non_mapping_files(check_module, tmp_path):
+    empty = tmp_path / "empty.yml"
+    empty.write_text("", encoding="utf-8")
+    listing = tmp_path / "list.yml"
+    listing.write_text("- a\n- b\n", encoding="utf-8")
+    
+    assert list(check_module.iter_yaml_list_items(str(empty), "nlu")) == []
+    assert list(check_module.iter_yaml_list_items(str(listing), "nlu")) == []
+
+
+@pytest.fixture
+def fixer(fix_module, tmp_path, monkeypatch):
+    """A fixer working on an empty Rasa project in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fix_module, "_parse_cache", {})
+    return fix_module.ConflictFixer()
+
+
+def backup_path(name):
+    return os.path.join("rasa_backups", name)
+
+
+def backups():
+    return sorted(name for name in os.listdir("rasa_backups") if ".backup." in name)
+
+
+def test_save_yaml_skips_identical_content(fixer):
+    data = {"version": "3.1", "intents": ["greet", "bye"]}
+    assert fixer._save_yaml(data, "domain.yml")
+    before = os.stat("domain.yml")
+    
+    assert fixer._save_yaml(dict(data), "domain.yml")
+    
+    after = os.stat("domain.yml")
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+    assert backups() == []
+
+
+def test_save_yaml_backs_up_original_with_hard_link(fixer):
+    assert fixer._save_yaml({"intents": ["greet"]}, "domain.yml")
+    original = os.stat("domain.yml")
+    
+    assert fixer._save_yaml({"intents": ["greet", "bye"]}, "domain.yml")
+    
+    [backup] = backups()
+    assert backup.startswith("domain.yml.backup.")
+    assert os.stat(backup_path(backup)).st_ino == original.st_ino
+    with open(backup_path(backup), encoding="utf-8") as file:
+        assert yaml.safe_load(file) == {"intents": ["greet"]}
+    with open("domain.yml", encoding="utf-8") as file:
+        assert yaml.safe_load(file) == {"intents": ["greet", "bye"]}
+    assert fixer._load_yaml("domain.yml") == {"intents": ["greet", "bye"]}
+
+
+def test_prune_backups_keeps_newest_per_file(fixer):
+    now = time.time()
+    for index in range(7):
+        path = backup_path(f"domain.yml.backup.2026010{index}_000000")
+        open(path, "w").close()
+        os.utime(path, (now - 100 + index, now - 100 + index))
+    for index in range(2):
+        open(backup_path(f"nlu.yml.backup.2026010{index}_000000"), "w").close()
+    open(backup_path("notes.txt"), "w").close()
+    
+    assert fixer._prune_backups(max_per_file=5) == 2
+    
+    remaining = backups()
+    assert [name for name in remaining if name.startswith("domain.yml")] == [
+        f"domain.yml.backup.2026010{index}_000000" for index in range(2, 7)
+    ]
+    assert len([name for name in remaining if name.startswith("nlu.yml")]) == 2
+    assert os.path.exists(backup_path("notes.txt"))
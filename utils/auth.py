@@ -2,14 +2,16 @@ import bcrypt
 import jwt
 import datetime
 import os
-from dotenv import load_dotenv
-from functools import wraps
+import time
+from functools import wraps, lru_cache
+from utils.env import load_env
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Get secret key from environment or use default
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
+SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')
 
 def hash_password(password):
     """Hash a password using bcrypt"""
@@ -32,13 +34,22 @@ def generate_token(user_id, username, expires_in=86400):
         'sub': user_id,
         'username': username
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
+    return jwt.encode(payload, SECRET_KEY_BYTES, algorithm='HS256')
+
+@lru_cache(maxsize=4096)
+def _decode_token_cached(token):
+    """Verify and decode a JWT token, caching the result per token string"""
+    return jwt.decode(token, SECRET_KEY_BYTES, algorithms=['HS256'])
 
 def decode_token(token):
     """Decode a JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        return payload
+        payload = _decode_token_cached(token)
+        
+        # Cached payloads were verified earlier, so expiry has to be rechecked
+        if payload['exp'] <= time.time():
+            raise jwt.ExpiredSignatureError('Signature has expired')
+        return dict(payload)
     except jwt.ExpiredSignatureError:
         return {'error': 'Token expired. Please log in again.'}
     except jwt.InvalidTokenError:
@@ -0,0 +1,18 @@
+"""
+Utility for loading environment variables from the .env file
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Set once the .env file has been loaded; child processes inherit it along with
+# the loaded variables, so they can skip parsing the file again
+ENV_LOADED_FLAG = "CHATBOT_ENV_LOADED"
+
+def load_env():
+    """Load the .env file unless this process or its parent already has"""
+    if os.environ.get(ENV_LOADED_FLAG):
+        return
+    
+    load_dotenv()
+    os.environ[ENV_LOADED_FLAG] = "1"
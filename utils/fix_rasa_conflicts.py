@@ -37,6 +37,9 @@ CONFIG_PATH = os.path.join(RASA_DIR, "config.yml")
 # Backup directory
 BACKUP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rasa_backups")
 
+# Entities in NLU examples, in format [entity_value](entity_name)
+ENTITY_RE = re.compile(r'\[.+?\]\((.+?)\)')
+
 class ConflictFixer:
     """Class to fix conflicts in Rasa files."""
     
@@ -202,7 +205,8 @@ class ConflictFixer:
         
         # Get actions from domain
         domain_actions = set(self.domain.get('actions', []))
-        domain_responses = set(self.domain.get('responses', {}).keys())
+        # Keys view of the responses mapping, usable as a set without copying it
+        domain_responses = (self.domain.get('responses') or {}).keys()
         all_defined_actions = domain_actions | domain_responses
         
         # Filter default actions
@@ -295,13 +299,12 @@ class {class_name}(Action):
         # Extract entities from NLU examples
         nlu_entities = set()
         if self.nlu and 'nlu' in self.nlu:
-            for item in self.nlu['nlu']:
-                if 'examples' in item:
-                    examples = item['examples']
-                    if isinstance(examples, str):
-                        # Find entities in format [entity_value](entity_name)
-                        entity_pattern = r'\[.+?\]\((.+?)\)'
-                        nlu_entities.update(re.findall(entity_pattern, examples))
+            # Scan all example blocks in one findall call
+            examples = "\n".join(
+                item['examples'] for item in self.nlu['nlu']
+                if isinstance(item.get('examples'), str)
+            )
+            nlu_entities = set(ENTITY_RE.findall(examples))
         
         # Get entities from domain
         domain_entities = set(self.domain.get('entities', []))
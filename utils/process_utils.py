@@ -0,0 +1,64 @@
+"""
+Utility functions for supervising child server processes
+"""
+
+import os
+import time
+import selectors
+import subprocess
+
+def wait_for_exit(processes):
+    """
+    Block until one of the child processes exits
+    
+    On Linux each child is watched through a pidfd so the orchestrator sleeps
+    in the kernel until a process exits instead of waking up to poll.
+    
+    Args:
+        processes (dict): Running child processes keyed by name
+        
+    Returns:
+        str: The name of the process that exited
+    """
+    if hasattr(os, "pidfd_open"):
+        selector = selectors.DefaultSelector()
+        try:
+            for name, process in processes.items():
+                selector.register(os.pidfd_open(process.pid), selectors.EVENT_READ, name)
+            
+            key, _ = selector.select()[0]
+            processes[key.data].wait()
+            return key.data
+        except OSError:
+            # pidfds are not supported by this kernel, fall back to polling
+            pass
+        finally:
+            for key in list(selector.get_map().values()):
+                selector.unregister(key.fileobj)
+                os.close(key.fileobj)
+            selector.close()
+    
+    while True:
+        for name, process in processes.items():
+            if process.poll() is not None:
+                return name
+        time.sleep(1)
+
+def stop_processes(processes, timeout=10):
+    """
+    Terminate child processes and wait for them to exit
+    
+    Args:
+        processes (dict): Running child processes keyed by name
+        timeout (float): Seconds to wait for each process before killing it
+    """
+    for process in processes.values():
+        if process.poll() is None:
+            process.terminate()
+    
+    for process in processes.values():
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -9,6 +9,7 @@ import requests
 import subprocess
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path to import utils
@@ -17,6 +18,16 @@ from database.models import SupportData, Message, Conversation
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+# Commands used to run the Rasa servers, keyed by server name
+RASA_COMMANDS = {
+    "rasa": ["rasa", "run", "--enable-api", "--cors", "*", "--port", "5005"],
+    "action": ["rasa", "run", "actions", "--port", "5055"]
+}
+RASA_NAMES = {"rasa": "Rasa server", "action": "Action server"}
+
+# Worker threads for Rasa requests, so they can overlap with database writes
+rasa_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rasa")
+
 class RasaIntegration:
     """Class to handle integration between Rasa and our existing chatbot"""
     
@@ -55,13 +66,10 @@ class RasaIntegration:
         """Start Rasa server and action server in separate processes"""
         print("Starting Rasa servers...")
         
-        # Change to the rasa bot directory
-        os.chdir(self.rasa_bot_dir)
-        
-        # Start Rasa action server
-        action_server_cmd = ["rasa", "run", "actions", "--port", "5055"]
+        # Start Rasa action server from the rasa bot directory
         action_server_process = subprocess.Popen(
-            action_server_cmd,
+            RASA_COMMANDS["action"],
+            cwd=self.rasa_bot_dir,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
@@ -72,9 +80,9 @@ class RasaIntegration:
         time.sleep(3)
         
         # Start Rasa server
-        rasa_server_cmd = ["rasa", "run", "--enable-api", "--cors", "*", "--port", "5005"]
         rasa_server_process = subprocess.Popen(
-            rasa_server_cmd,
+            RASA_COMMANDS["rasa"],
+            cwd=self.rasa_bot_dir,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
@@ -86,16 +94,23 @@ class RasaIntegration:
         
         return rasa_server_process, action_server_process
     
+    def restart_rasa_server(self, name):
+        """Restart a stopped Rasa server by name ('rasa' or 'action')"""
+        return subprocess.Popen(
+            RASA_COMMANDS[name],
+            cwd=self.rasa_bot_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    
     def train_rasa_model(self):
         """Train the Rasa model"""
         print("Training Rasa model...")
         
-        # Change to the rasa bot directory
-        os.chdir(self.rasa_bot_dir)
-        
-        # Run training command
+        # Run training command from the rasa bot directory
         result = subprocess.run(
             ["rasa", "train"],
+            cwd=self.rasa_bot_dir,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
@@ -177,10 +192,11 @@ class RasaIntegration:
             if not conversation_id:
                 conversation = Conversation(user_id=user_id)
                 session.add(conversation)
-                session.commit()
+                session.flush()
                 conversation_id = conversation.id
-            else:
-                conversation = session.query(Conversation).get(conversation_id)
+            
+            # Send message to Rasa in the background while the user message is saved
+            rasa_future = rasa_executor.submit(self.send_to_rasa, message_text, conversation_id)
             
             # Save user message
             user_message = Message(
@@ -191,9 +207,9 @@ class RasaIntegration:
             session.add(user_message)
             session.commit()
             
-            # Send message to Rasa
+            # Wait for the Rasa response
             try:
-                rasa_response = self.send_to_rasa(message_text, conversation_id)
+                rasa_response = rasa_future.result()
                 if rasa_response and "text" in rasa_response:
                     response_text = rasa_response["text"]
                 else: